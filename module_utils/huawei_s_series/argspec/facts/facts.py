@@ -21,4 +21,8 @@ class FactsArgs(object):
     argument_spec = {
         'gather_subset': dict(default=['!config'], type='list'),
         'gather_network_resources': dict(type='list'),
+        'incremental': dict(default=False, type='bool'),
+        'config_format': dict(default='text', choices=['text', 'digest']),
+        'config_store': dict(type='path'),
+        'lldp_neighbor_detail': dict(default=[], type='list'),
     }
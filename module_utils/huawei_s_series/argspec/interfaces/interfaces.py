@@ -45,4 +45,5 @@ class InterfacesArgs(object):
                                 'type': 'list'},
                      'state': {'choices': ['merged', 'replaced', 'overridden', 'deleted'],
                                'default': 'merged',
-                               'type': 'str'}}
+                               'type': 'str'},
+                     'facts_ttl': {'default': 0, 'type': 'int'}}
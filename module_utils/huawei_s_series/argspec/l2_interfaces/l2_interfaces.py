@@ -59,4 +59,5 @@ class L2_InterfacesArgs(object):
                                 'type': 'list'},
                      'state': {'choices': ['merged', 'replaced', 'overridden', 'deleted'],
                                'default': 'merged',
-                               'type': 'str'}}
+                               'type': 'str'},
+                     'facts_ttl': {'default': 0, 'type': 'int'}}
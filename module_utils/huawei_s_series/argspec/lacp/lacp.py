@@ -44,5 +44,6 @@ class LacpArgs(object):
                                }, 'type': 'dict'
                    },
         'state': {'choices': ['merged', 'replaced', 'deleted'], 'default': 'merged',
-                  'type': 'str'}
+                  'type': 'str'},
+        'facts_ttl': {'default': 0, 'type': 'int'}
     }
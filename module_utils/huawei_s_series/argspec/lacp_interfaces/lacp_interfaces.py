@@ -44,4 +44,5 @@ class Lacp_InterfacesArgs(object):
                                 'type': 'list'},
                      'state': {'choices': ['merged', 'replaced', 'overridden', 'deleted'],
                                'default': 'merged',
-                               'type': 'str'}}
+                               'type': 'str'},
+                     'facts_ttl': {'default': 0, 'type': 'int'}}
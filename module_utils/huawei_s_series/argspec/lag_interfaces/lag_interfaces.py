@@ -47,4 +47,5 @@ class Lag_interfacesArgs(object):
                                 'type': 'list'},
                      'state': {'choices': ['merged', 'replaced', 'overridden', 'deleted'],
                                'default': 'merged',
-                               'type': 'str'}}
+                               'type': 'str'},
+                     'facts_ttl': {'default': 0, 'type': 'int'}}
@@ -42,4 +42,5 @@ class Lldp_globalArgs(object):
                                 'type': 'dict'},
                      'state': {'choices': ['merged', 'replaced', 'deleted'],
                                'default': 'merged',
-                               'type': 'str'}}
+                               'type': 'str'},
+                     'facts_ttl': {'default': 0, 'type': 'int'}}
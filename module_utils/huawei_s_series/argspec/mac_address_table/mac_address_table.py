@@ -0,0 +1,23 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The arg spec for the huawei_s_mac_address_table module
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+class Mac_address_tableArgs(object):
+    """The arg spec for the huawei_s_mac_address_table module
+    """
+
+    def __init__(self, **kwargs):
+        pass
+
+    argument_spec = {'vlans': {'elements': 'int', 'type': 'list'},
+                     'interfaces': {'elements': 'str', 'type': 'list'},
+                     'expand': {'default': False, 'type': 'bool'}}
@@ -17,6 +17,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s_series.facts.facts import Facts
+from ansible.module_utils.network.huawei_s_series.huawei_s import get_timings, add_timings
 from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, dict_to_set
 from ansible.module_utils.network.huawei_s_series.utils.utils import remove_command_from_config_list, add_command_to_config_list
 from ansible.module_utils.network.huawei_s_series.utils.utils import filter_dict_having_none_value, remove_duplicate_interface
@@ -63,13 +64,16 @@ class Interfaces(ConfigBase):
         result = {'changed': False}
         commands = list()
         warnings = list()
+        timings = get_timings(self._module)
 
         existing_interfaces_facts = self.get_interfaces_facts()
-        commands.extend(self.set_config(existing_interfaces_facts))
+        with timings.phase('diff'):
+            commands.extend(self.set_config(existing_interfaces_facts))
         #raise Exception(commands)
         if commands:
             if not self._module.check_mode:
-                self._connection.edit_config(commands)
+                with timings.phase('push'):
+                    self._connection.edit_config(commands)
             result['changed'] = True
         result['commands'] = commands
 
@@ -80,7 +84,7 @@ class Interfaces(ConfigBase):
             result['after'] = changed_interfaces_facts
         result['warnings'] = warnings
 
-        return result
+        return add_timings(self._module, result)
 
     def set_config(self, existing_interfaces_facts):
         """ Collect the configuration from the args passed to the module,
@@ -18,6 +18,7 @@ __metaclass__ = type
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s_series.facts.facts import Facts
+from ansible.module_utils.network.huawei_s_series.huawei_s import get_timings, add_timings
 from ansible.module_utils.network.huawei_s_series.utils.utils import dict_to_set
 
 
@@ -60,13 +61,16 @@ class Lacp(ConfigBase):
         result = {'changed': False}
         commands = list()
         warnings = list()
+        timings = get_timings(self._module)
 
         existing_lacp_facts = self.get_lacp_facts()
-        commands.extend(self.set_config(existing_lacp_facts))
+        with timings.phase('diff'):
+            commands.extend(self.set_config(existing_lacp_facts))
 
         if commands:
             if not self._module.check_mode:
-                self._connection.edit_config(commands)
+                with timings.phase('push'):
+                    self._connection.edit_config(commands)
             result['changed'] = True
         result['commands'] = commands
 
@@ -77,7 +81,7 @@ class Lacp(ConfigBase):
             result['after'] = changed_lacp_facts
         result['warnings'] = warnings
 
-        return result
+        return add_timings(self._module, result)
 
     def set_config(self, existing_lacp_facts):
         """ Collect the configuration from the args passed to the module,
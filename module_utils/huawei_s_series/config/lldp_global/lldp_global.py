@@ -17,6 +17,7 @@ from ansible.module_utils.six import iteritems
 from ansible.module_utils.network.common.cfg.base import ConfigBase
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.network.huawei_s_series.facts.facts import Facts
+from ansible.module_utils.network.huawei_s_series.huawei_s import get_timings, add_timings
 from ansible.module_utils.network.huawei_s_series.utils.utils import dict_to_set
 from ansible.module_utils.network.huawei_s_series.utils.utils import filter_dict_having_none_value
 
@@ -60,12 +61,15 @@ class Lldp_global(ConfigBase):
         result = {'changed': False}
         commands = list()
         warnings = list()
+        timings = get_timings(self._module)
 
         existing_lldp_global_facts = self.get_lldp_global_facts()
-        commands.extend(self.set_config(existing_lldp_global_facts))
+        with timings.phase('diff'):
+            commands.extend(self.set_config(existing_lldp_global_facts))
         if commands:
             if not self._module.check_mode:
-                self._connection.edit_config(commands)
+                with timings.phase('push'):
+                    self._connection.edit_config(commands)
             result['changed'] = True
         result['commands'] = commands
 
@@ -76,7 +80,7 @@ class Lldp_global(ConfigBase):
             result['after'] = changed_lldp_global_facts
         result['warnings'] = warnings
 
-        return result
+        return add_timings(self._module, result)
 
     def set_config(self, existing_lldp_global_facts):
         """ Collect the configuration from the args passed to the module,
@@ -13,7 +13,19 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import hashlib
+import sys
+import threading
+import time
+
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six import reraise
+from ansible.module_utils.six.moves.queue import Queue
 from ansible.module_utils.network.common.facts.facts import FactsBase
+from ansible.module_utils.network.huawei_s_series.huawei_s import CHANNELS, run_commands, get_connection, get_timings
+from ansible.module_utils.network.huawei_s_series.utils.cache import FactsCache
+from ansible.module_utils.network.huawei_s_series.utils.profile import PROFILE
 from ansible.module_utils.network.huawei_s_series.facts.interfaces.interfaces import InterfacesFacts
 from ansible.module_utils.network.huawei_s_series.facts.l2_interfaces.l2_interfaces import L2_InterfacesFacts
 from ansible.module_utils.network.huawei_s_series.facts.vlans.vlans import VlansFacts
@@ -23,6 +35,7 @@ from ansible.module_utils.network.huawei_s_series.facts.lacp_interfaces.lacp_int
 from ansible.module_utils.network.huawei_s_series.facts.lldp_global.lldp_global import Lldp_globalFacts
 from ansible.module_utils.network.huawei_s_series.facts.lldp_interfaces.lldp_interfaces import Lldp_InterfacesFacts
 from ansible.module_utils.network.huawei_s_series.facts.l3_interfaces.l3_interfaces import L3_InterfacesFacts
+from ansible.module_utils.network.huawei_s_series.facts.mac_address_table.mac_address_table import Mac_address_tableFacts
 from ansible.module_utils.network.huawei_s_series.facts.legacy.base import Default, Hardware, Interfaces, Config
 
 
@@ -43,8 +56,41 @@ FACT_RESOURCE_SUBSETS = dict(
     lldp_global=Lldp_globalFacts,
     lldp_interfaces=Lldp_InterfacesFacts,
     l3_interfaces=L3_InterfacesFacts,
+    mac_address_table=Mac_address_tableFacts,
+)
+
+# the display command each resource parses, they are fetched in stages
+# while the resources of the stages before are populated
+FACT_RESOURCE_COMMANDS = dict(
+    interfaces='display interface',
+    l2_interfaces='display port vlan',
+    vlans='display vlan',
+    lag_interfaces='display eth-trunk',
+    lacp='display lacp brief',
+    lacp_interfaces='display eth-trunk',
+    lldp_global='display lldp local',
+    lldp_interfaces='display current-configuration interface',
+    l3_interfaces='display current-configuration interface',
+    mac_address_table='display mac-address',
 )
 
+# the resources too large to gather with 'all', only when named
+FACT_RESOURCE_NOT_IN_ALL = frozenset(['mac_address_table'])
+
+# the resources whose facts only change with the configuration, with
+# `incremental` they are served from the facts cache until it changes,
+# with `facts_ttl` any resource is while it is younger than the ttl
+FACT_RESOURCE_CONFIG_DERIVED = frozenset([
+    'l2_interfaces', 'vlans', 'lag_interfaces', 'lacp', 'lacp_interfaces',
+    'lldp_global', 'lldp_interfaces', 'l3_interfaces',
+])
+
+# tells when the configuration changed last, cheaper than fetching it
+CHANGE_MARKER_COMMAND = 'display changed-configuration time'
+
+# commands fetched per stage, one per session run_commands_parallel() uses
+PIPELINE_STAGE = CHANNELS + 1
+
 
 class Facts(FactsBase):
     """ The fact class for huawei_s
@@ -53,8 +99,13 @@ class Facts(FactsBase):
     VALID_LEGACY_GATHER_SUBSETS = frozenset(FACT_LEGACY_SUBSETS.keys())
     VALID_RESOURCE_SUBSETS = frozenset(FACT_RESOURCE_SUBSETS.keys())
 
-    def __init__(self, module):
+    def __init__(self, module, write_cache=False):
+        """
+        :param write_cache: store the resources gathered in the facts cache
+                            even without incremental or facts_ttl
+        """
         super(Facts, self).__init__(module)
+        self._write_cache = write_cache
 
     def get_facts(self, legacy_facts_type=None, resource_facts_type=None, data=None):
         """ Collect the facts for huawei_s
@@ -68,6 +119,153 @@ class Facts(FactsBase):
             self.get_network_resources_facts(FACT_RESOURCE_SUBSETS, resource_facts_type, data)
 
         if self.VALID_LEGACY_GATHER_SUBSETS:
-            self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
+            # the legacy subsets time their own fetch
+            with get_timings(self._module).phase('parse'):
+                self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
 
         return self.ansible_facts, self._warnings
+
+    def get_network_resources_facts(self, facts_resource_obj_map, resource_facts_type=None, data=None):
+        """
+        Same as FactsBase.get_network_resources_facts() but, unless data
+        is given, the commands of the resources run in stages over parallel
+        sessions, each command once.  The resources of a stage are populated
+        on a worker thread while the next stage is fetched, one after the
+        other in the order of their names.  A resource whose output came
+        back empty is populated on this thread once the worker is done with
+        the ones before, as populate_facts() fetches it again then.
+        :param fact_resource_subsets:
+        :param data: previously collected configuration
+        :return:
+        """
+        if data:
+            return super(Facts, self).get_network_resources_facts(facts_resource_obj_map, resource_facts_type, data)
+
+        if not resource_facts_type:
+            resource_facts_type = self._gather_network_resources
+
+        restorun_subsets = self.gen_runable(resource_facts_type, frozenset(facts_resource_obj_map.keys()), resource_facts=True)
+        restorun_subsets.difference_update(FACT_RESOURCE_NOT_IN_ALL.difference(resource_facts_type))
+        if not restorun_subsets:
+            return
+
+        self.ansible_facts['ansible_net_gather_network_resources'] = list(restorun_subsets)
+        timings = get_timings(self._module)
+
+        pending = list()
+        for key in sorted(restorun_subsets):
+            if not facts_resource_obj_map.get(key):
+                self._warnings.extend(["network resource fact gathering for '%s' is not supported" % key])
+            elif key not in FACT_RESOURCE_COMMANDS:
+                with timings.phase('parse'):
+                    facts_resource_obj_map[key](self._module).populate_facts(self._connection, self.ansible_facts)
+            else:
+                pending.append(key)
+
+        incremental = self._module.params.get('incremental')
+        ttl = self._module.params.get('facts_ttl')
+        cache = self._get_facts_cache()
+        marker = self._get_change_marker() if cache and incremental else None
+        cached = list()
+        if cache and (marker or ttl):
+            for key in list(pending):
+                entry = cache.get_fresh(key, ttl) if ttl else None
+                if not entry and key in FACT_RESOURCE_CONFIG_DERIVED:
+                    entry = cache.get_facts(key, marker)
+                if entry:
+                    pending.remove(key)
+                    cached.append(key)
+                    if entry['facts'] is not None:
+                        self.ansible_facts['ansible_network_resources'][key] = entry['facts']
+        if incremental or ttl:
+            self.ansible_facts['ansible_net_cached_network_resources'] = cached
+
+        gathered = list(pending)
+        commands = list()
+        for key in pending:
+            if FACT_RESOURCE_COMMANDS[key] not in commands:
+                commands.append(FACT_RESOURCE_COMMANDS[key])
+
+        queue = Queue()
+        failed = list()
+
+        def populate():
+            while True:
+                item = queue.get()
+                try:
+                    if item is None:
+                        return
+                    if failed:
+                        # keep taking the items for queue.join()
+                        continue
+                    key, out = item
+                    start = time.time()
+                    try:
+                        facts_resource_obj_map[key](self._module).populate_facts(self._connection, self.ansible_facts, out)
+                    except BaseException:
+                        failed.append(sys.exc_info())
+                    finally:
+                        timings.add('parse', time.time() - start)
+                finally:
+                    queue.task_done()
+
+        # cProfile only sees the thread it was started in, parse inline then
+        worker = None
+        if PROFILE != 'cpu':
+            worker = threading.Thread(target=populate)
+            worker.daemon = True
+            worker.start()
+        try:
+            outputs = dict()
+            for index in range(0, len(commands), PIPELINE_STAGE):
+                if failed:
+                    break
+                stage = commands[index:index + PIPELINE_STAGE]
+                with timings.phase('fetch'):
+                    outputs.update(zip(stage, run_commands(self._module, stage, parallel=True)))
+                while pending and FACT_RESOURCE_COMMANDS[pending[0]] in outputs:
+                    key = pending.pop(0)
+                    out = outputs[FACT_RESOURCE_COMMANDS[key]]
+                    if worker and out:
+                        queue.put((key, out))
+                    else:
+                        if worker:
+                            # populate_facts() fetches empty data again
+                            # itself, the connection is only used here
+                            queue.join()
+                            if failed:
+                                break
+                        with timings.phase('parse'):
+                            facts_resource_obj_map[key](self._module).populate_facts(self._connection, self.ansible_facts, out)
+        finally:
+            if worker:
+                queue.put(None)
+                worker.join()
+        if failed:
+            reraise(*failed[0])
+
+        if cache and gathered and (incremental or ttl or self._write_cache):
+            resources = self.ansible_facts['ansible_network_resources']
+            cache.set_facts(dict((key, resources.get(key)) for key in gathered), marker)
+
+    def _get_facts_cache(self):
+        """ Return the facts cache of the host the connection is to
+        """
+        try:
+            host = get_connection(self._module).get_host()
+        except ConnectionError:
+            return None
+        return FactsCache(host) if host else None
+
+    def _get_change_marker(self):
+        """ Return a digest of the time the configuration changed last or
+        None when the device can not tell
+        """
+        with get_timings(self._module).phase('fetch'):
+            try:
+                out = get_connection(self._module).run_commands(commands=[CHANGE_MARKER_COMMAND], check_rc=True)[0]
+            except ConnectionError:
+                return None
+        out = (out or '').strip()
+        if out:
+            return hashlib.sha1(to_bytes(out, errors='surrogate_or_strict')).hexdigest()
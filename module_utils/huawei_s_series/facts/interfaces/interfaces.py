@@ -17,7 +17,7 @@ __metaclass__ = type
 from copy import deepcopy
 import re
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_sections
 from ansible.module_utils.network.huawei_s_series.argspec.interfaces.interfaces import InterfacesArgs
 
 
@@ -52,7 +52,7 @@ class InterfacesFacts(object):
         if not data:
             data = connection.get('display interface')
         # operate on a collection of resource x
-        config = data.split('\n\n')
+        config = iter_sections(data, '\n\n')
         for conf in config:
             if conf:
                 obj = self.render_config(self.generated_spec, conf)
@@ -16,7 +16,7 @@ __metaclass__ = type
 from copy import deepcopy
 import re
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_lines
 from ansible.module_utils.network.huawei_s_series.argspec.l2_interfaces.l2_interfaces import L2_InterfacesArgs
 
 
@@ -51,7 +51,7 @@ class L2_InterfacesFacts(object):
         if not data:
             data = connection.get('display port vlan')
         # operate on a collection of resource x
-        config = data.split('\n')
+        config = iter_lines(data)
 
         for conf in config:
             if conf:
@@ -17,7 +17,7 @@ __metaclass__ = type
 from copy import deepcopy
 import re
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_sections
 from ansible.module_utils.network.huawei_s_series.argspec.l3_interfaces.l3_interfaces import L3_InterfacesArgs
 
 
@@ -52,7 +52,7 @@ class L3_InterfacesFacts(object):
         if not data:
             data = connection.get('display current-configuration interface')
         # operate on a collection of resource x
-        config = re.split('interface ', data)
+        config = iter_sections(data, 'interface ')
         for conf in config:
             if conf:
                 obj = self.render_config(self.generated_spec, conf)
@@ -17,7 +17,7 @@ __metaclass__ = type
 import re
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_sections
 from ansible.module_utils.network.huawei_s_series.argspec.lacp_interfaces.lacp_interfaces import Lacp_InterfacesArgs
 
 
@@ -55,7 +55,7 @@ class Lacp_InterfacesFacts(object):
         if not data:
             data = connection.get('display eth-trunk')
         # operate on a collection of resource x
-        config = re.split(r'\n\s*\n', data)
+        config = iter_sections(data, re.compile(r'\n\s*\n'))
 
         for conf in config:
             if conf:
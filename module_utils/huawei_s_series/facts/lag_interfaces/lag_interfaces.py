@@ -18,7 +18,7 @@ import re
 from copy import deepcopy
 
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_sections
 from ansible.module_utils.network.huawei_s_series.argspec.lag_interfaces.lag_interfaces import Lag_interfacesArgs
 
 
@@ -53,7 +53,7 @@ class Lag_interfacesFacts(object):
         if not data:
             data = connection.get('display eth-trunk')
         # operate on a collection of resource x
-        config = re.split(r'\n\s*\n', data)
+        config = iter_sections(data, re.compile(r'\n\s*\n'))
         for conf in config:
             if conf:
                 obj = self.render_config(self.generated_spec, conf)
@@ -17,8 +17,14 @@ __metaclass__ = type
 import platform
 import re
 
-from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands, get_capabilities
+from itertools import chain
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands, get_capabilities, get_connection, get_timings
 from ansible.module_utils.network.huawei_s_series.huawei_s import normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.store import CONFIG_STORE, ConfigStore
+from ansible.module_utils.network.huawei_s_series.utils.utils import iter_lines, iter_sections
 from ansible.module_utils.six import iteritems
 from ansible.module_utils.six.moves import zip
 
@@ -34,10 +40,12 @@ class FactsBase(object):
         self.responses = None
 
     def populate(self):
-        self.responses = run_commands(self.module, commands=self.COMMANDS, check_rc=False)
+        with get_timings(self.module).phase('fetch'):
+            self.responses = run_commands(self.module, commands=self.COMMANDS, check_rc=False, parallel=True)
 
-    def run(self, cmd):
-        return run_commands(self.module, commands=cmd, check_rc=False)
+    def run(self, cmd, parallel=False):
+        with get_timings(self.module).phase('fetch'):
+            return run_commands(self.module, commands=cmd, check_rc=False, parallel=parallel)
 
 
 class Default(FactsBase):
@@ -92,48 +100,79 @@ class Hardware(FactsBase):
 
     COMMANDS = [
         'dir',
-        'display memory-usage'
+        'display memory-usage',
+        'display stack'
     ]
 
+    DIRECTORY_RE = re.compile(r'^(?:Directory of (\S+)/|([\d,]+) KB total \(([\d,]+) KB free\))')
+
     def populate(self):
-        warnings = list()
         super(Hardware, self).populate()
-        data = self.responses[0]
-        if data:
-            self.facts['filesystems'] = self.parse_filesystems(data)
-            self.facts['filesystems_info'] = self.parse_filesystems_info(data)
 
-        data = self.responses[1]
-        if data:
-            if 'Invalid input detected' in data:
-                warnings.append('Unable to gather memory statistics')
-            else:
-                match_total = re.search(r'^\s*[Ss]ystem\s+[Tt]otal\s+[Mm]emory\s+[Ii]s\s*:\s*(\d*)', data, re.M)
-                match_used = re.search(r'^\s*[Tt]otal\s+[Mm]emory\s+[Uu]sed\s+[Ii]s\s*:\s*(\d+)', data, re.M)
-                match_free = int(match_total.group(1)) - int(match_used.group(1))
-                if match_total and match_free:
-                    self.facts['memtotal_mb'] = int(match_total.group(1)) / 1048576
-                    self.facts['memfree_mb'] = int(match_free) / 1048576
-
-    def parse_filesystems(self, data):
-        return re.findall(r'^Directory of (\S+)/', data, re.M)
-
-    def parse_filesystems_info(self, data):
+        # the master answers the plain commands, the other members of a
+        # stack are asked by slot, all in one batch
+        members = self.parse_stack_members(self.responses[2])
+        master = next((slot for slot, role in members if role == 'Master'), None)
+        slots = [slot for slot, role in members if role != 'Master']
+        commands = list()
+        for slot in slots:
+            commands.extend(['dir slot%s#flash:' % slot, 'display memory-usage slot %s' % slot])
+        responses = self.run(commands, parallel=True) if commands else []
+
+        dirs = [data for data in [self.responses[0]] + responses[0::2] if data]
+        if dirs:
+            self.facts['filesystems'], self.facts['filesystems_info'] = self.parse_filesystems(dirs)
+
+        stacked_memory = dict()
+        for slot, data in [(master, self.responses[1])] + list(zip(slots, responses[1::2])):
+            if not data:
+                continue
+            memory = self.parse_memory(data)
+            if memory is None:
+                self.warnings.append('Unable to gather memory statistics%s' % (' of slot %s' % slot if slot else ''))
+                continue
+            if slot == master:
+                self.facts.update(memory)
+            if slot is not None:
+                stacked_memory[slot] = memory
+        if len(members) > 1:
+            self.facts['stacked_memory'] = stacked_memory
+
+    def parse_stack_members(self, data):
+        """ Return (slot, role) of the stack members in the order listed
+        """
+        return re.findall(r'^(\d+)\s+(Master|Standby|Slave)\s', data or '', re.M)
+
+    def parse_memory(self, data):
+        match_total = re.search(r'^\s*[Ss]ystem\s+[Tt]otal\s+[Mm]emory\s+[Ii]s\s*:\s*(\d+)', data, re.M)
+        match_used = re.search(r'^\s*[Tt]otal\s+[Mm]emory\s+[Uu]sed\s+[Ii]s\s*:\s*(\d+)', data, re.M)
+        if not (match_total and match_used):
+            return None
+        total = int(match_total.group(1))
+        return {
+            'memtotal_mb': total / 1048576,
+            'memfree_mb': (total - int(match_used.group(1))) / 1048576,
+        }
+
+    def parse_filesystems(self, outputs):
+        """ Parse the `dir` outputs of all members in one pass over their
+        lines, return the file systems and their total and free space
+        """
+        filesystems = list()
         facts = dict()
-        fs = ''
-        for line in data.split('\n'):
-            match = re.match(r'^Directory of (\S+)/', line)
-            if match:
+        fs = None
+        for line in chain.from_iterable(iter_lines(data) for data in outputs):
+            match = self.DIRECTORY_RE.match(line)
+            if not match:
+                continue
+            if match.group(1):
                 fs = match.group(1)
+                filesystems.append(fs)
                 facts[fs] = dict()
-                continue
-            match = re.match(r'^(\S+) KB total \((\S+) KB free\)', line)
-            if match:
-                match_total = ''.join(match.group(1).split(','))
-                match_free = ''.join(match.group(2).split(','))
-                facts[fs]['spacetotal_kb'] = int(match_total)
-                facts[fs]['spacefree_kb'] = int(match_free)
-        return facts
+            elif fs is not None:
+                facts[fs]['spacetotal_kb'] = int(match.group(2).replace(',', ''))
+                facts[fs]['spacefree_kb'] = int(match.group(3).replace(',', ''))
+        return filesystems, facts
 
 
 class Config(FactsBase):
@@ -147,7 +186,27 @@ class Config(FactsBase):
             data = re.sub(
                 r'^Software Version \S+\n',
                 '', data, flags=re.MULTILINE)
-            self.facts['config'] = data
+            if self.module.params.get('config_format') == 'digest':
+                self.facts.update(self.store_config(data))
+            else:
+                self.facts['config'] = data
+
+    def store_config(self, data):
+        """ Put the configuration in the config store, return facts that
+        describe it instead of the text
+        """
+        store = ConfigStore(self.module.params.get('config_store') or CONFIG_STORE)
+        try:
+            host = get_connection(self.module).get_host()
+            digest, written = store.put(host, data)
+        except (ConnectionError, IOError, OSError) as exc:
+            self.module.fail_json(msg='unable to store the configuration: %s' % to_text(exc))
+        return {
+            'config_digest': digest,
+            'config_size': len(to_bytes(data, errors='surrogate_or_strict')),
+            'config_lines': data.count('\n') + 1,
+            'config_store': store.path,
+        }
 
 
 class Interfaces(FactsBase):
@@ -186,9 +245,7 @@ class Interfaces(FactsBase):
         lldp_errs = ['Invalid input', 'Info: Global LLDP is not enabled.']
 
         if data and not any(err in data for err in lldp_errs):
-            neighbors = self.run(['display lldp neighbor'])
-            if neighbors:
-                self.facts['neighbors'].update(self.parse_neighbors(neighbors[0]))
+            self.facts['neighbors'].update(self.populate_lldp_neighbors())
 
         data = self.responses[4]
         cdp_errs = ['Info: Global LLDP is not enabled.']
@@ -251,9 +308,67 @@ class Interfaces(FactsBase):
         else:
             self.facts['all_ipv6_addresses'].append(address)
 
+    def populate_lldp_neighbors(self):
+        """ Take host and port of the LLDP neighbors from the brief table,
+        and the detail only for the interfaces in lldp_neighbor_detail
+        """
+        detail = [normalize_interface(intf) for intf in self.module.params.get('lldp_neighbor_detail') or []]
+        if 'all' in detail:
+            return self.parse_neighbors(self.run(['display lldp neighbor'])[0])
+
+        facts = self.parse_neighbors_brief(self.run(['display lldp neighbor brief'])[0])
+        if facts is None:
+            # no brief table on this version
+            return self.parse_neighbors(self.run(['display lldp neighbor'])[0])
+
+        if detail:
+            commands = ['display lldp neighbor interface %s' % intf for intf in detail]
+            for out in self.run(commands, parallel=True):
+                facts.update(self.parse_neighbors(out))
+        return facts
+
+    def parse_neighbors_brief(self, neighbors):
+        """ Parse `display lldp neighbor brief`, or return None when there
+        is no table in it
+
+        The columns are not in the same order on all versions and the
+        device name may have spaces, it gets what the other columns leave.
+        A neighbor that sends no system name, like an IP phone, leaves the
+        device column empty, the header offsets tell the columns apart then.
+        """
+        columns = None
+        facts = dict()
+        for line in iter_lines(neighbors):
+            if columns is None:
+                if line.startswith('Local Int'):
+                    header = list(re.finditer(r'Local|Exptime|Neighbor\s+(?:Dev|Int|Port)', line))
+                    columns = ['host' if 'Dev' in match.group() else 'port' if 'Neighbor' in match.group() else match.group().lower()
+                               for match in header]
+                    starts = [match.start() for match in header]
+                    if 'host' not in columns:
+                        columns = None
+                continue
+            tokens = line.split()
+            if line.startswith('-') or len(tokens) < len(columns) - 1:
+                continue
+            if len(tokens) < len(columns):
+                values = dict((name, line[start:end].strip())
+                              for name, start, end in zip(columns, starts, starts[1:] + [None]))
+            else:
+                host = columns.index('host')
+                after = len(columns) - host - 1
+                values = dict(zip(columns[:host], tokens[:host]))
+                values.update(zip(columns[host + 1:], tokens[len(tokens) - after:]))
+                values['host'] = ' '.join(tokens[host:len(tokens) - after])
+
+            intf = normalize_interface(values['local'])
+            # no system name is None, as in the detail output
+            facts.setdefault(intf, list()).append({'host': values['host'] or None, 'port': normalize_interface(values.get('port'))})
+        return facts if columns is not None else None
+
     def parse_neighbors(self, neighbors):
         facts = dict()
-        for entry in neighbors.split('Maximum frame Size       :'):
+        for entry in iter_sections(neighbors, 'Maximum frame Size       :'):
             if entry == '':
                 continue
             intf = self.parse_lldp_intf(entry)
@@ -270,7 +385,7 @@ class Interfaces(FactsBase):
 
     def parse_cdp_neighbors(self, neighbors):
         facts = dict()
-        for entry in neighbors.split('-------------------------'):
+        for entry in iter_sections(neighbors, '-------------------------'):
             if entry == '':
                 continue
             intf_port = self.parse_cdp_intf_port(entry)
@@ -288,7 +403,7 @@ class Interfaces(FactsBase):
     def parse_interfaces(self, data):
         parsed = dict()
         key = ''
-        for line in data.split('\n'):
+        for line in iter_lines(data):
             match = re.match(
                 r'^(Vlanif\d+|GigabitEthernet\d+/\d+/\d+|XGigabitEthernet\d+/\d+/\d+|25GE\d+/\d+/\d+|40GE\d+/\d+/\d+|100GE\d+/\d+/\d+)',
                 line)
@@ -16,6 +16,7 @@ __metaclass__ = type
 import re
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
+from ansible.module_utils.network.huawei_s_series.utils.utils import iter_lines
 from ansible.module_utils.network.huawei_s_series.argspec.lldp_global.lldp_global import Lldp_globalArgs
 
 
@@ -49,7 +50,7 @@ class Lldp_globalFacts(object):
         if not data:
             data = connection.get('display lldp local')
         # operate on a collection of resource x
-        config = data.split('\n')
+        config = iter_lines(data)
         for conf in config:
             if conf:
                 obj = self.render_config(self.generated_spec, conf)
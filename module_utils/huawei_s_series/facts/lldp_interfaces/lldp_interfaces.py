@@ -17,7 +17,7 @@ __metaclass__ = type
 import re
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
-from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface
+from ansible.module_utils.network.huawei_s_series.utils.utils import get_interface_type, normalize_interface, iter_sections
 from ansible.module_utils.network.huawei_s_series.argspec.lldp_interfaces.lldp_interfaces import Lldp_InterfacesArgs
 
 
@@ -55,7 +55,7 @@ class Lldp_InterfacesFacts(object):
         if not data:
             data = connection.get('display current-configuration interface')
         # operate on a collection of resource x
-        config = data.split('interface ')
+        config = iter_sections(data, 'interface ')
 
         for conf in config:
             if conf:
@@ -0,0 +1,176 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s mac_address_table fact class
+It is in this file the MAC address table is collected from the device,
+parsed in one pass over its lines, and the facts tree is populated with
+it in a compact form.
+
+The table has one column per field, of integers:
+  {
+      'macs': [0x00259e957c31, ...],
+      'vlans': [10, ...],
+      'interface_index': [0, ...],   index into 'interfaces'
+      'type_index': [0, ...],        index into 'types'
+      'interfaces': ['GigabitEthernet0/0/1', ...],
+      'types': ['dynamic', 'static', ...],
+      'count': 1,
+  }
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from array import array
+from itertools import product
+
+from ansible.module_utils.network.huawei_s_series.huawei_s import normalize_interface, run_commands, get_timings
+from ansible.module_utils.network.huawei_s_series.utils.utils import iter_lines
+
+
+# the entry types, in the order of their index in the table, the types
+# met that are not listed are added after them
+MAC_TYPES = ('dynamic', 'static', 'blackhole', 'security', 'sec-config', 'sticky',
+             'authen', 'guest', 'mux', 'snooping', 'evpn')
+
+try:
+    array('Q')
+    MAC_TYPECODE = 'Q'
+except ValueError:
+    # python 2, 8 bytes on 64 bit platforms
+    MAC_TYPECODE = 'L'
+
+
+class MacTable(object):
+    """ MAC address table entries kept in columns of machine integers,
+    the interfaces and types are interned and stored as indexes
+    """
+
+    def __init__(self):
+        self.macs = array(MAC_TYPECODE)
+        self.vlans = array('H')
+        self.interface_index = array('I')
+        self.type_index = array('B')
+        self.interfaces = list()
+        self.types = list(MAC_TYPES)
+        self._interfaces = dict()
+        self._types = dict((name, index) for index, name in enumerate(MAC_TYPES))
+
+    def __len__(self):
+        return len(self.macs)
+
+    def _intern_interface(self, port):
+        index = self._interfaces.get(port)
+        if index is None:
+            index = self._interfaces[port] = len(self.interfaces)
+            self.interfaces.append(normalize_interface(port))
+        return index
+
+    def parse(self, data):
+        """ Add the entries of a `display mac-address` output
+
+        Newer versions list `MAC VLAN/VSI/BD Learned-From Type`, older ones
+        have PEVLAN and CEVLAN columns before the port and LSP after the
+        type.  The port is the column before the type either way.
+        """
+        types = self._types
+        for line in iter_lines(data):
+            if len(line) < 15 or line[4] != '-' or line[9] != '-':
+                continue
+            tokens = line.split()
+            try:
+                mac = int(tokens[0].replace('-', ''), 16)
+            except ValueError:
+                continue
+
+            for index in range(3, len(tokens)):
+                if tokens[index] in types:
+                    break
+            else:
+                if len(tokens) != 4:
+                    continue
+                # a type this module does not know of
+                index = 3
+                types[tokens[3]] = len(self.types)
+                self.types.append(tokens[3])
+
+            vlan = tokens[1].split('/', 1)[0]
+            self.macs.append(mac)
+            self.vlans.append(int(vlan) if vlan.isdigit() else 0)
+            self.interface_index.append(self._intern_interface(tokens[index - 1]))
+            self.type_index.append(types[tokens[index]])
+
+    def to_dict(self):
+        return {
+            'macs': self.macs.tolist(),
+            'vlans': self.vlans.tolist(),
+            'interface_index': self.interface_index.tolist(),
+            'type_index': self.type_index.tolist(),
+            'interfaces': self.interfaces,
+            'types': self.types,
+            'count': len(self),
+        }
+
+
+def expand_mac_table(table):
+    """ Return the entries of a compact table as a list of dicts
+    """
+    interfaces = table['interfaces']
+    types = table['types']
+    entries = list()
+    for mac, vlan, interface, mac_type in zip(table['macs'], table['vlans'], table['interface_index'], table['type_index']):
+        mac = '%012x' % mac
+        entries.append({
+            'mac': '%s-%s-%s' % (mac[0:4], mac[4:8], mac[8:12]),
+            'vlan': vlan,
+            'interface': interfaces[interface],
+            'type': types[mac_type],
+        })
+    return entries
+
+
+class Mac_address_tableFacts(object):
+    """ The huawei_s mac_address_table fact class
+    """
+
+    def __init__(self, module, subspec=None, options=None):
+        self._module = module
+
+    def get_commands(self):
+        """ The commands the vlans and interfaces options filter the table
+        with on the device, one per combination
+        """
+        vlans = self._module.params.get('vlans') or [None]
+        interfaces = self._module.params.get('interfaces') or [None]
+        commands = list()
+        for vlan, interface in product(vlans, interfaces):
+            command = 'display mac-address'
+            if interface:
+                command += ' %s' % normalize_interface(interface)
+            if vlan:
+                command += ' vlan %s' % vlan
+            if command not in commands:
+                commands.append(command)
+        return commands
+
+    def populate_facts(self, connection, ansible_facts, data=None):
+        """ Populate the facts for mac_address_table
+        :param connection: the device connection
+        :param ansible_facts: Facts dictionary
+        :param data: previously collected table
+        :rtype: dictionary
+        :returns: facts
+        """
+        if data is None:
+            with get_timings(self._module).phase('fetch'):
+                # a vlan or interface the device rejects fails the module with its
+                # error instead of reading as an empty table
+                data = run_commands(self._module, self.get_commands(), check_rc=True, parallel=True)
+        table = MacTable()
+        for out in data if isinstance(data, list) else [data]:
+            table.parse(out)
+        ansible_facts['ansible_network_resources']['mac_address_table'] = table.to_dict()
+        return ansible_facts
@@ -16,6 +16,7 @@ __metaclass__ = type
 
 from copy import deepcopy
 from ansible.module_utils.network.common import utils
+from ansible.module_utils.network.huawei_s_series.utils.utils import iter_lines
 from ansible.module_utils.network.huawei_s_series.argspec.vlans.vlans import VlansArgs
 
 
@@ -53,7 +54,7 @@ class VlansFacts(object):
         if not data:
             data = connection.get('display vlan')
         # operate on a collection of resource x
-        config = data.split('\n')
+        config = iter_lines(data)
         # Get individual vlan configs separately
         vlan_info = ''
         for conf in config:
@@ -26,14 +26,37 @@
 # USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 #
 import json
+import os
+import re
+import time
+
+from contextlib import contextmanager
 
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import env_fallback
+from ansible.module_utils.parsing.convert_bool import boolean
 from ansible.module_utils.network.common.utils import to_list
 from ansible.module_utils.connection import Connection, ConnectionError
+from ansible.module_utils.network.huawei_s_series.utils.config_tree import ConfigTree
+from ansible.module_utils.network.huawei_s_series.utils.profile import PROFILE, Profiler, profile_path
+from ansible.module_utils.network.huawei_s_series.utils.spill import SPILL_THRESHOLD, load_output, load_outputs
 
 _DEVICE_CONFIGS = {}
 
+# with HUAWEI_S_TIMINGS set, modules return a `timings` key, see add_timings()
+TIMINGS = boolean(os.environ.get('HUAWEI_S_TIMINGS', False), strict=False)
+
+# with HUAWEI_S_MMI_MODE set, the terminal plugin enables MMI mode once for
+# the whole session instead of every edit_config(), so all commands get its
+# output without echo and interactive questions
+MMI_MODE = boolean(os.environ.get('HUAWEI_S_MMI_MODE', False), strict=False)
+
+# the most secondary SSH sessions run_commands_parallel() opens to a device,
+# none unless HUAWEI_S_CHANNELS is set.  Each one is a login of its own that
+# takes a VTY and shows in the device logs, VRP allows 5 VTY sessions by
+# default and the persistent one takes one
+CHANNELS = int(os.environ.get('HUAWEI_S_CHANNELS', 0))
+
 huawei_s_provider_spec = {
     'host': dict(),
     'port': dict(type='int'),
@@ -80,6 +103,117 @@ def get_connection(module):
     return module._huawei_s_connection
 
 
+class Timings(object):
+    """ Wall time spent in the phases of a module run
+
+    Phases may nest, the time of an inner phase is not counted again in
+    the phase around it, so the phases add up to the time measured.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.phases = dict()
+        self._stack = list()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.time()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            inner = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.phases[name] = round(self.phases.get(name, 0.0) + elapsed - inner, 6)
+
+    def add(self, name, elapsed):
+        """ Count time measured outside phase(), e.g. in another thread,
+        where it overlaps the phases of the module thread
+        """
+        self.phases[name] = round(self.phases.get(name, 0.0) + elapsed, 6)
+
+
+def get_timings(module):
+    if hasattr(module, '_huawei_s_timings'):
+        return module._huawei_s_timings
+
+    module._huawei_s_timings = Timings(enabled=TIMINGS)
+    if TIMINGS:
+        # drop what the connection recorded for the tasks before this one
+        try:
+            get_connection(module).get_timings(reset=True)
+        except ConnectionError as exc:
+            module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
+    return module._huawei_s_timings
+
+
+def add_timings(module, result):
+    """ Add the phase and command timings of this run to result, if enabled
+    """
+    timings = get_timings(module)
+    if timings.enabled:
+        try:
+            commands = get_connection(module).get_timings(reset=True)
+        except ConnectionError as exc:
+            module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
+        model = get_capabilities(module).get('device_info', {}).get('network_os_model')
+        result['timings'] = {'phases': timings.phases, 'connection': commands, 'model': model}
+    return result
+
+
+def profile_module(module):
+    """ Profile the rest of the module run when HUAWEI_S_PROFILE is set,
+    main() calls it on the AnsibleModule it created
+
+    The result module.exit_json() or module.fail_json() returns gets a
+    `profile` key with the top hot spots of the module and of the cliconf
+    methods it called, the full stats are written to a file per host.
+    """
+    profiler = Profiler(PROFILE)
+    if not profiler.enabled:
+        return module
+
+    def add_profile(result):
+        profiler.stop()
+        profile = dict()
+        host = None
+        if module._socket_path:
+            try:
+                profile['connection'] = Connection(module._socket_path).get_profile()
+                host = profile['connection']['host']
+            except (ConnectionError, KeyError, TypeError):
+                pass
+        if not host:
+            device_info = getattr(module, '_huawei_s_capabilities', {}).get('device_info', {})
+            host = device_info.get('network_os_hostname') or 'localhost'
+        try:
+            profile['module'] = profiler.report(profile_path(host, module._name))
+        except (IOError, OSError) as exc:
+            # the module did its work, a profile it can not write
+            # must not fail it
+            module.warn('unable to write the profile: %s' % to_text(exc))
+        result['profile'] = profile
+
+    exit_json = module.exit_json
+    fail_json = module.fail_json
+
+    def profiled_exit_json(**kwargs):
+        add_profile(kwargs)
+        exit_json(**kwargs)
+
+    def profiled_fail_json(**kwargs):
+        add_profile(kwargs)
+        fail_json(**kwargs)
+
+    # only this instance is changed, AnsibleModule itself is left alone
+    module.exit_json = profiled_exit_json
+    module.fail_json = profiled_fail_json
+    profiler.start()
+    return module
+
+
 def get_capabilities(module):
     if hasattr(module, '_huawei_s_capabilities'):
         return module._huawei_s_capabilities
@@ -118,7 +252,7 @@ def get_config(module, flags=None):
     except KeyError:
         connection = get_connection(module)
         try:
-            out = connection.get_config(flags=flags)
+            out = load_output(connection.get_config(flags=flags, spill=SPILL_THRESHOLD))
         except ConnectionError as exc:
             if section_filter:
                 # Some huawei_s devices don't understand `| section foo`
@@ -130,10 +264,15 @@ def get_config(module, flags=None):
         return cfg
 
 
-def run_commands(module, commands, check_rc=True):
+def run_commands(module, commands, check_rc=True, parallel=False):
     connection = get_connection(module)
     try:
-        return connection.run_commands(commands=commands, check_rc=check_rc)
+        if parallel:
+            # independent display commands, run over several sessions
+            responses = connection.run_commands_parallel(commands=commands, check_rc=check_rc, spill=SPILL_THRESHOLD)
+        else:
+            responses = connection.run_commands(commands=commands, check_rc=check_rc, spill=SPILL_THRESHOLD)
+        return load_outputs(responses)
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
 
@@ -148,6 +287,32 @@ def load_config(module, commands):
         module.fail_json(msg=to_text(exc))
 
 
+def is_config_modified(module, diff_ignore_lines=None):
+    """Return True if the current configuration differs from the saved one
+
+    The device is asked first with `compare configuration`, which only
+    reports whether the current configuration matches the next startup
+    configuration.  Both configurations are downloaded and compared only
+    when the device can not answer or when `diff_ignore_lines` has to be
+    applied to a reported difference.
+    """
+    out = run_commands(module, 'compare configuration', check_rc=False)[0]
+    out = to_text(out, errors='surrogate_then_replace')
+
+    if re.search(r'is not the same as the next startup configuration', out, re.I):
+        if not diff_ignore_lines:
+            return True
+    elif re.search(r'is the same as the next startup configuration', out, re.I):
+        return False
+
+    output = run_commands(module, ['display current-configuration', 'display saved-configuration'])
+
+    running_config = ConfigTree(indent=1, contents=output[0], ignore_lines=diff_ignore_lines)
+    startup_config = ConfigTree(indent=1, contents=output[1], ignore_lines=diff_ignore_lines)
+
+    return running_config.sha1 != startup_config.sha1
+
+
 def normalize_interface(name):
     """Return the normalized interface name
     """
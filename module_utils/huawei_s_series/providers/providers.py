@@ -8,7 +8,7 @@ from threading import RLock
 
 from ansible.module_utils.six import itervalues
 from ansible.module_utils.network.common.utils import to_list
-from ansible.module_utils.network.common.config import NetworkConfig
+from ansible.module_utils.network.huawei_s_series.utils.config_tree import ConfigTree
 
 
 _registered_providers = {}
@@ -86,7 +86,7 @@ class CliProvider(ProviderBase):
 
     def get_config_context(self, config, path, indent=1):
         if config is not None:
-            netcfg = NetworkConfig(indent=indent, contents=config)
+            netcfg = ConfigTree(indent=indent, contents=config)
             try:
                 config = netcfg.get_block_config(to_list(path))
             except ValueError:
@@ -0,0 +1,171 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s controller side caches
+They are small JSON files on the controller that outlive a playbook run,
+so that what was learned about a platform or a host does not have to be
+probed again by every task.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import json
+import os
+import time
+
+from ansible.module_utils._text import to_bytes
+from ansible.module_utils.network.huawei_s_series.utils.store import write_atomic
+
+
+CACHE_DIR = os.environ.get('HUAWEI_S_CACHE_DIR', '~/.ansible/huawei_s')
+
+
+class JsonFileCache(object):
+    """ A dict persisted as one JSON file
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(os.path.expandvars(path))
+        self._data = None
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self._data = json.load(f)
+        except (IOError, OSError, ValueError):
+            self._data = dict()
+        return self._data
+
+    @property
+    def data(self):
+        if self._data is None:
+            self.load()
+        return self._data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def update(self, key, values):
+        """ Merge values into the entry for key and write the file
+
+        The file is read again before it is written, so entries stored
+        meanwhile by other processes are kept.
+        """
+        self.load()
+        entry = self._data.setdefault(key, dict())
+        entry.update(values)
+        self.save()
+        return entry
+
+    def remove(self, key):
+        self.load()
+        if self._data.pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        write_atomic(self.path, to_bytes(json.dumps(self._data, indent=1, sort_keys=True)))
+
+
+class PlatformCache(JsonFileCache):
+    """ What was probed about a platform, by network_os_model and version
+
+    Entries look like
+        {
+            'S5720-28X-LI-AC/V200R010C00SPC600': {
+                'defaults_flag': 'all',
+                'filters': {'section': False, 'include': True}
+            }
+        }
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.environ.get('HUAWEI_S_PLATFORM_CACHE', os.path.join(CACHE_DIR, 'platform_cache.json'))
+        super(PlatformCache, self).__init__(path)
+
+    @staticmethod
+    def platform_key(device_info):
+        model = device_info.get('network_os_model')
+        version = device_info.get('network_os_version')
+        if model and version:
+            return '%s/%s' % (model, version)
+
+    def get_feature(self, device_info, name, default=None):
+        key = self.platform_key(device_info)
+        if not key:
+            return default
+        return self.get(key, dict()).get(name, default)
+
+    def set_feature(self, device_info, name, value):
+        key = self.platform_key(device_info)
+        if key:
+            try:
+                self.update(key, {name: value})
+            except (IOError, OSError):
+                # the cache is an optimization, never fail the task for it
+                pass
+
+    def get_filter(self, device_info, name):
+        return self.get_feature(device_info, 'filters', dict()).get(name)
+
+    def set_filter(self, device_info, name, supported):
+        filters = dict(self.get_feature(device_info, 'filters', dict()))
+        filters[name] = supported
+        self.set_feature(device_info, 'filters', filters)
+
+
+class FactsCache(JsonFileCache):
+    """ The parsed resource facts of a host, by resource
+
+    There is one file per host, entries look like
+        {
+            'vlans': {'time': 1571234567.1, 'marker': '<sha1>', 'facts': [...]}
+        }
+    `marker` is the change marker of the configuration the facts were
+    gathered from, or None when it was not asked.  A push to the host
+    removes its file, see clear().
+    """
+
+    def __init__(self, host, path=None):
+        if path is None:
+            path = os.environ.get('HUAWEI_S_FACTS_CACHE', os.path.join(CACHE_DIR, 'facts'))
+        super(FactsCache, self).__init__(os.path.join(path, '%s.json' % host.replace(os.sep, '_')))
+
+    def get_facts(self, resource, marker):
+        """ Return the cache entry of resource if it was gathered at marker
+        """
+        entry = self.get(resource)
+        if marker and entry and entry.get('marker') == marker:
+            return entry
+
+    def get_fresh(self, resource, ttl):
+        """ Return the cache entry of resource if it is at most ttl seconds old
+        """
+        entry = self.get(resource)
+        if entry and 0 <= time.time() - entry.get('time', 0) <= ttl:
+            return entry
+
+    def set_facts(self, facts, marker=None):
+        """ Store the facts of several resources gathered now, at marker
+        """
+        self.load()
+        now = time.time()
+        for resource, value in facts.items():
+            self._data[resource] = {'time': now, 'marker': marker, 'facts': value}
+        try:
+            self.save()
+        except (IOError, OSError):
+            # the cache is an optimization, never fail the task for it
+            pass
+
+    def clear(self):
+        self._data = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
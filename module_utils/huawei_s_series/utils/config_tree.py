@@ -0,0 +1,324 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s config tree
+It is a NetworkConfig that indexes every level of the configuration
+hierarchy by line text, so that parents and sections are resolved in
+O(depth) and a line diff only looks up the lines of the candidate.
+The config diff shared by the cliconf plugin and the modules lives here too.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import hashlib
+import re
+
+from ansible.module_utils._text import to_bytes, to_native
+from ansible.module_utils.six import iteritems
+from ansible.module_utils.network.common.config import NetworkConfig, ConfigLine, Pattern, dumps, ignore_line
+
+
+# compiled diff_ignore_lines matchers by pattern set digest, kept for the
+# life of the process (one module run, or one persistent connection)
+_IGNORE_MATCHERS = {}
+
+
+class IgnoreLines(object):
+    """ A compiled diff_ignore_lines matcher
+
+    The patterns are combined into a single alternation so every line is
+    tested once instead of once per pattern.  Patterns that can not be
+    combined (compiled objects, back references) are tested on their own.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._regexes = list()
+
+        combined = list()
+        for item in self.patterns:
+            if isinstance(item, Pattern) or re.search(r'\\\d|\(\?P=', item):
+                self._regexes.append(item if isinstance(item, Pattern) else re.compile(item))
+            else:
+                combined.append('(?:%s)' % item)
+
+        if combined:
+            try:
+                self._regexes.insert(0, re.compile('|'.join(combined)))
+            except re.error:
+                self._regexes[:0] = [re.compile(item[3:-1]) for item in combined]
+
+    def __bool__(self):
+        return bool(self._regexes)
+
+    __nonzero__ = __bool__
+
+    def match(self, text):
+        for regex in self._regexes:
+            if regex.match(text):
+                return True
+        return False
+
+
+def ignore_lines_digest(patterns):
+    sha1 = hashlib.sha1()
+    for item in patterns:
+        if isinstance(item, Pattern):
+            item = '%s/%s' % (item.pattern, item.flags)
+        sha1.update(to_bytes(item, errors='surrogate_or_strict') + b'\0')
+    return sha1.hexdigest()
+
+
+def get_ignore_matcher(patterns):
+    """ Return the compiled IgnoreLines for patterns, or None if empty
+    """
+    if not patterns:
+        return None
+    if isinstance(patterns, IgnoreLines):
+        return patterns
+    digest = ignore_lines_digest(patterns)
+    try:
+        return _IGNORE_MATCHERS[digest]
+    except KeyError:
+        matcher = _IGNORE_MATCHERS[digest] = IgnoreLines(patterns)
+        return matcher
+
+
+class ConfigTree(NetworkConfig):
+    """ The huawei_s indexed config tree
+    """
+
+    def __init__(self, indent=1, contents=None, ignore_lines=None):
+        self._index = None
+        # unlike NetworkConfig, ignore_lines are not added to the global
+        # DEFAULT_IGNORE_LINES_RE, they only apply to this config
+        self._ignore_lines = get_ignore_matcher(ignore_lines)
+        super(ConfigTree, self).__init__(indent=indent, contents=contents)
+
+    @property
+    def index(self):
+        """ The nested {text: [ConfigLine, {children}]} index of the config
+        """
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def _build_index(self):
+        # items are ordered so a parent is always seen before its children,
+        # setdefault keeps the first match like NetworkConfig.get_object()
+        index = dict()
+        for item in self._items:
+            level = index
+            for parent in item._parents:
+                level = level.setdefault(parent.text, [parent, dict()])[1]
+            level.setdefault(item.text, [item, dict()])
+        return index
+
+    def load(self, s):
+        super(ConfigTree, self).load(s)
+        self._index = None
+
+    def add(self, lines, parents=None):
+        super(ConfigTree, self).add(lines, parents=parents)
+        self._index = None
+
+    def parse(self, lines, comment_tokens=None):
+        toplevel = re.compile(r'\S')
+        childline = re.compile(r'^\s*(.+)$')
+        entry_reg = re.compile(r'([{};])')
+
+        ancestors = list()
+        config = list()
+
+        indents = [0]
+
+        for linenum, line in enumerate(to_native(lines, errors='surrogate_or_strict').split('\n')):
+            text = entry_reg.sub('', line).strip()
+
+            if not text or ignore_line(text, comment_tokens):
+                continue
+
+            if self._ignore_lines and self._ignore_lines.match(text):
+                continue
+
+            cfg = ConfigLine(line)
+
+            # handle top level commands
+            if toplevel.match(line):
+                ancestors = [cfg]
+                indents = [0]
+
+            # handle sub level commands
+            else:
+                match = childline.match(line)
+                line_indent = match.start(1)
+
+                if line_indent < indents[-1]:
+                    while indents[-1] > line_indent:
+                        indents.pop()
+
+                if line_indent > indents[-1]:
+                    indents.append(line_indent)
+
+                curlevel = len(indents) - 1
+                parent_level = curlevel - 1
+
+                cfg._parents = ancestors[:curlevel]
+
+                if curlevel > len(ancestors):
+                    config.append(cfg)
+                    continue
+
+                for i in range(curlevel, len(ancestors)):
+                    ancestors.pop()
+
+                ancestors.append(cfg)
+                ancestors[parent_level].add_child(cfg)
+
+            config.append(cfg)
+
+        return config
+
+    def get_object(self, path):
+        level = self.index
+        node = None
+        for text in path:
+            node = level.get(text)
+            if node is None:
+                return None
+            level = node[1]
+        if node:
+            return node[0]
+
+    def has_line(self, item):
+        """ Return True if a line with the same path as item exists
+        """
+        level = self.index
+        for parent in item._parents:
+            node = level.get(parent.text)
+            if node is None:
+                return False
+            level = node[1]
+        return item.text in level
+
+    def _diff_line(self, other):
+        if isinstance(other, ConfigTree):
+            return [item for item in self.items if not other.has_line(item)]
+        return super(ConfigTree, self)._diff_line(other)
+
+    def difference(self, other, match='line', path=None, replace=None):
+        """Perform a config diff against the another network config
+
+        Same as NetworkConfig.difference() but a line diff against another
+        ConfigTree only visits the lines of this config.  Any other diff is
+        left to NetworkConfig.difference(), errors included.
+
+        :param other: instance of NetworkConfig to diff against
+        :param match: type of diff to perform.  valid values are 'line',
+            'strict', 'exact'
+        :param path: context in the network config to filter the diff
+        :param replace: the method used to generate the replacement lines.
+            valid values are 'block', 'line'
+
+        :returns: a list of ConfigLines that are different
+        """
+        if match != 'line' or not isinstance(other, ConfigTree):
+            return super(ConfigTree, self).difference(other, match=match, path=path, replace=replace)
+
+        updates = self._diff_line(other)
+
+        if replace == 'block':
+            parents = list()
+            for item in updates:
+                if not item.has_parents:
+                    parents.append(item)
+                else:
+                    for p in item._parents:
+                        if p not in parents:
+                            parents.append(p)
+
+            updates = list()
+            for item in parents:
+                updates.extend(self._expand_block(item))
+
+        visited = set()
+        expanded = list()
+
+        for item in updates:
+            for p in item._parents:
+                if p.line not in visited:
+                    visited.add(p.line)
+                    expanded.append(p)
+            expanded.append(item)
+            visited.add(item.line)
+
+        return expanded
+
+
+def extract_banners(config):
+    banners = {}
+    banner_cmds = re.findall(r'^header (\w+)', config, re.M)
+    for cmd in banner_cmds:
+        regex = r'header %s information \^C(.+?)(?=\^C)' % cmd
+        match = re.search(regex, config, re.S)
+        if match:
+            key = 'header %s' % cmd
+            banners[key] = match.group(1).strip()
+
+    for cmd in banner_cmds:
+        regex = r'header %s information \^C(.+?)(?=\^C)' % cmd
+        match = re.search(regex, config, re.S)
+        if match:
+            config = config.replace(str(match.group(1)), '')
+
+    config = re.sub(r'header \w+ \w+ ""#', '!! banner removed', config)
+    return config, banners
+
+
+def diff_banners(want, have):
+    candidate = {}
+    for key, value in iteritems(want):
+        if value != have.get(key):
+            candidate[key] = value
+    return candidate
+
+
+def get_config_diff(candidate, running=None, diff_match='line', diff_ignore_lines=None, path=None, diff_replace='line'):
+    """ Generate the diff between candidate and running configuration
+
+    This is the implementation behind Cliconf.get_diff().  Modules that
+    already hold the running configuration call it directly instead of
+    sending both configurations over the connection socket.
+
+    :returns: Configuration diff as a dict
+           {
+               'config_diff': '',
+               'banner_diff': {}
+           }
+    """
+    diff = {}
+
+    # prepare candidate configuration
+    candidate_obj = ConfigTree(indent=1)
+    want_src, want_banners = extract_banners(candidate)
+    candidate_obj.load(want_src)
+
+    if running and diff_match != 'none':
+        # running configuration
+        have_src, have_banners = extract_banners(running)
+        running_obj = ConfigTree(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
+        configdiffobjs = candidate_obj.difference(running_obj, path=path, match=diff_match, replace=diff_replace)
+
+    else:
+        configdiffobjs = candidate_obj.items
+        have_banners = {}
+
+    diff['config_diff'] = dumps(configdiffobjs, 'commands') if configdiffobjs else ''
+    banners = diff_banners(want_banners, have_banners)
+    diff['banner_diff'] = banners if banners else {}
+    return diff
@@ -0,0 +1,132 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s profiler
+With HUAWEI_S_PROFILE set to cpu or mem, the huawei_s modules and the
+cliconf plugin run under cProfile or tracemalloc.  The stats are written
+to a file per host and the top hot spots are returned in the result:
+  HUAWEI_S_PROFILE_DIR/<host>.<name>.prof         cpu, read with pstats
+  HUAWEI_S_PROFILE_DIR/<host>.<name>.tracemalloc  mem, read with
+                                                  tracemalloc.Snapshot.load
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import cProfile
+import os
+import pstats
+
+from contextlib import contextmanager
+
+from ansible.module_utils.network.huawei_s_series.utils.store import makedirs
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+PROFILE = os.environ.get('HUAWEI_S_PROFILE', '').lower()
+PROFILE_TOP = int(os.environ.get('HUAWEI_S_PROFILE_TOP', 20))
+PROFILE_DIR = os.environ.get('HUAWEI_S_PROFILE_DIR', '~/.ansible/huawei_s/profile')
+
+EXTENSIONS = {'cpu': 'prof', 'mem': 'tracemalloc'}
+
+
+def profile_path(host, name):
+    path = os.path.expanduser(os.path.expandvars(PROFILE_DIR))
+    return os.path.join(path, '%s.%s' % (host.replace(os.sep, '_'), name))
+
+
+def _location(filename, lineno):
+    # modules run from a zip in a temp dir, keep the path from ansible/ on
+    if '/ansible/' in filename:
+        filename = 'ansible/' + filename.rsplit('/ansible/', 1)[1]
+    return '%s:%s' % (filename, lineno)
+
+
+class Profiler(object):
+    """ cProfile or tracemalloc, started around the code to profile
+
+    Runs may nest and repeat, the stats add up until report().
+    tracemalloc is not available on python 2, mem is ignored there.
+    """
+
+    def __init__(self, mode=PROFILE):
+        if mode == 'mem' and tracemalloc is None:
+            mode = None
+        self.mode = mode if mode in EXTENSIONS else None
+        self._profile = None
+        self._depth = 0
+
+    @property
+    def enabled(self):
+        return self.mode is not None
+
+    def start(self):
+        if self.mode == 'cpu':
+            if self._profile is None:
+                self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == 'mem' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stop(self):
+        if self.mode == 'cpu' and self._profile is not None:
+            self._profile.disable()
+
+    @contextmanager
+    def run(self):
+        if not self.enabled:
+            yield
+            return
+        if not self._depth:
+            self.start()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                self.stop()
+
+    def report(self, path, top=PROFILE_TOP):
+        """ Write the stats gathered so far to path with the extension of
+        the mode, return the top hot spots and start over
+        """
+        if not self.enabled:
+            return None
+        path = '%s.%s' % (path, EXTENSIONS[self.mode])
+        makedirs(os.path.dirname(path))
+        result = {'mode': self.mode, 'file': path}
+
+        if self.mode == 'cpu':
+            if self._profile is None:
+                result['top'] = []
+                return result
+            self.stop()
+            stats = pstats.Stats(self._profile)
+            stats.dump_stats(path)
+            hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+            result['total'] = round(stats.total_tt, 6)
+            result['top'] = [{'function': '%s(%s)' % (_location(func[0], func[1]), func[2]),
+                              'calls': nc, 'tottime': round(tt, 6), 'cumtime': round(ct, 6)}
+                             for func, (cc, nc, tt, ct, callers) in hot]
+            self._profile = None
+        else:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            snapshot.dump(path)
+            result['peak'] = tracemalloc.get_traced_memory()[1]
+            result['top'] = [{'line': _location(stat.traceback[0].filename, stat.traceback[0].lineno),
+                              'size': stat.size, 'count': stat.count}
+                             for stat in snapshot.statistics('lineno')[:top]]
+            tracemalloc.clear_traces()
+        return result
@@ -0,0 +1,112 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s output spill files
+Command outputs larger than a threshold are handed from the persistent
+connection to the module through a temp file on the controller instead of
+the JSON-RPC socket.  Only a reference goes over the socket:
+  {'path': '/tmp/huawei_s_out...', 'sha1': '...', 'size': 12345}
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import hashlib
+import os
+import tempfile
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.connection import ConnectionError
+
+
+# outputs larger than this many bytes are spilled when the caller asks
+SPILL_THRESHOLD = int(os.environ.get('HUAWEI_S_SPILL_THRESHOLD', 1048576))
+
+
+def spill_output(out, threshold=None):
+    """ Return out, or a reference to a temp file holding it when it is
+    larger than threshold bytes
+
+    The file is created readable by the current user only, the reader
+    removes it.
+    """
+    if not threshold:
+        return out
+    data = to_bytes(out, errors='surrogate_or_strict')
+    if len(data) <= threshold:
+        return out
+
+    fd, path = tempfile.mkstemp(prefix='huawei_s_out')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return {'path': path, 'sha1': hashlib.sha1(data).hexdigest(), 'size': len(data)}
+
+
+def spill_outputs(outputs, threshold=None):
+    """ Return spill_output() of each of outputs, the files already
+    written are removed when one fails
+    """
+    spilled = list()
+    try:
+        for out in outputs:
+            spilled.append(spill_output(out, threshold))
+    except Exception:
+        discard_outputs(spilled)
+        raise
+    return spilled
+
+
+def is_spilled(out):
+    return isinstance(out, Mapping) and 'path' in out and 'sha1' in out
+
+
+def discard_outputs(outputs):
+    """ Remove the files of the spilled outputs, for when they will not
+    be loaded
+    """
+    for out in outputs:
+        if is_spilled(out):
+            try:
+                os.remove(out['path'])
+            except OSError:
+                pass
+
+
+def load_output(out):
+    """ Return the text of out, reading it back if it was spilled
+
+    A spilled output that can not be read back raises ConnectionError,
+    like an output lost on the socket would.
+    """
+    if not is_spilled(out):
+        return out
+
+    try:
+        with open(out['path'], 'rb') as f:
+            data = f.read()
+    except (IOError, OSError) as exc:
+        raise ConnectionError('unable to read spilled output: %s' % to_text(exc))
+    finally:
+        discard_outputs([out])
+    if hashlib.sha1(data).hexdigest() != out['sha1']:
+        raise ConnectionError('spilled output %s does not match its digest' % out['path'])
+    return to_text(data, errors='surrogate_or_strict')
+
+
+def load_outputs(outputs):
+    """ Return load_output() of each of outputs, the files not read yet
+    are removed when one fails
+    """
+    loaded = list()
+    try:
+        for index, out in enumerate(outputs):
+            loaded.append(load_output(out))
+    except Exception:
+        discard_outputs(outputs[index + 1:])
+        raise
+    return loaded
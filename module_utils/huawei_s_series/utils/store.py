@@ -0,0 +1,189 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s config store
+It is a content addressed, compressed store for configuration text kept
+on the controller.  Objects are named by the sha256 of their text and
+are only written when the text was not stored before.  An object is kept
+as a line delta against the previous version of the same host when one
+exists, and a manifest per host maps the time of every store to a digest.
+
+Layout of the store directory:
+  objects/<digest[:2]>/<digest>  gzip compressed JSON object
+  refs/<host>                    digest last stored for host
+  manifest/<host>.jsonl          one {"time", "digest", "size"} per store
+
+A path separator in a host name is replaced with `_`.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+import difflib
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from io import BytesIO
+
+from ansible.module_utils._text import to_bytes, to_text
+
+
+# longest chain of deltas before a full copy of the text is stored again
+MAX_DELTA_CHAIN = 16
+
+# where huawei_s_facts stores the configuration with config_format=digest
+CONFIG_STORE = os.environ.get('HUAWEI_S_CONFIG_STORE', '~/.ansible/huawei_s/config_store')
+
+
+def config_digest(text):
+    return hashlib.sha256(to_bytes(text, errors='surrogate_or_strict')).hexdigest()
+
+
+def makedirs(dirname):
+    if not os.path.isdir(dirname):
+        try:
+            os.makedirs(dirname)
+        except OSError:
+            if not os.path.isdir(dirname):
+                raise
+
+
+def write_atomic(path, data):
+    dirname = os.path.dirname(path)
+    makedirs(dirname)
+    fd, tmp = tempfile.mkstemp(dir=dirname, prefix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.rename(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class ConfigStore(object):
+    """ The huawei_s content addressed config store
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(os.path.expandvars(path))
+
+    def object_path(self, digest):
+        return os.path.join(self.path, 'objects', digest[:2], digest)
+
+    def _ref_path(self, host):
+        return os.path.join(self.path, 'refs', host.replace(os.sep, '_'))
+
+    def _manifest_path(self, host):
+        return os.path.join(self.path, 'manifest', '%s.jsonl' % host.replace(os.sep, '_'))
+
+    def exists(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def _load_object(self, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return json.loads(to_text(f.read(), errors='surrogate_or_strict'))
+
+    def _write_object(self, digest, obj):
+        buf = BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+            f.write(to_bytes(json.dumps(obj, separators=(',', ':')), errors='surrogate_or_strict'))
+        write_atomic(self.object_path(digest), buf.getvalue())
+
+    def head(self, host):
+        """ Return the digest last stored for host or None
+        """
+        try:
+            with open(self._ref_path(host)) as f:
+                return f.read().strip() or None
+        except (IOError, OSError):
+            return None
+
+    def get(self, digest):
+        """ Return the text stored under digest, applying deltas as needed
+        """
+        obj = self._load_object(digest)
+        if obj.get('base') is None:
+            return obj['text']
+
+        base = self.get(obj['base']).split('\n')
+        lines = list()
+        for op in obj['ops']:
+            if op[0] == 'c':
+                lines.extend(base[op[1]:op[2]])
+            else:
+                lines.extend(op[1])
+        return '\n'.join(lines)
+
+    def _delta(self, base_text, text):
+        base = base_text.split('\n')
+        lines = text.split('\n')
+        ops = list()
+        inserted = 0
+        matcher = difflib.SequenceMatcher(None, base, lines)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                ops.append(['c', i1, i2])
+            elif j2 > j1:
+                ops.append(['i', lines[j1:j2]])
+                inserted += j2 - j1
+        # a delta that carries most of the text is not worth the chain
+        if inserted * 2 > len(lines):
+            return None
+        return ops
+
+    def put(self, host, text, timestamp=None):
+        """ Store text as the current configuration of host
+
+        :returns: a tuple of digest and a bool that is True when a new
+                  object was written
+        """
+        digest = config_digest(text)
+        written = False
+
+        if not self.exists(digest):
+            obj = {'base': None, 'depth': 0, 'text': text}
+            parent = self.head(host)
+            if parent and self.exists(parent):
+                parent_obj = self._load_object(parent)
+                depth = parent_obj.get('depth', 0) + 1
+                if depth < MAX_DELTA_CHAIN:
+                    ops = self._delta(self.get(parent), text)
+                    if ops is not None:
+                        obj = {'base': parent, 'depth': depth, 'ops': ops}
+            self._write_object(digest, obj)
+            written = True
+
+        if self.head(host) != digest:
+            write_atomic(self._ref_path(host), to_bytes(digest))
+
+        entry = {'time': timestamp or time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()),
+                 'digest': digest, 'size': len(to_bytes(text, errors='surrogate_or_strict'))}
+        manifest = self._manifest_path(host)
+        makedirs(os.path.dirname(manifest))
+        with open(manifest, 'a') as f:
+            f.write(json.dumps(entry, sort_keys=True) + '\n')
+
+        return digest, written
+
+    def history(self, host):
+        """ Return the manifest entries of host, oldest first
+        """
+        entries = list()
+        try:
+            with open(self._manifest_path(host)) as f:
+                for line in f:
+                    if line.strip():
+                        entries.append(json.loads(line))
+        except (IOError, OSError):
+            pass
+        return entries
@@ -13,6 +13,37 @@ from ansible.module_utils.six import iteritems
 from ansible.module_utils.network.common.utils import is_masklen, to_netmask
 
 
+def iter_sections(data, separator):
+    """ Generate the pieces of data split at separator, one at a time
+
+    Gives the same pieces as data.split(separator), or re.split() when
+    separator is a compiled regex, without building the list of all of
+    them, so a large output is not held twice while it is parsed.
+    """
+    start = 0
+    if hasattr(separator, 'finditer'):
+        for match in separator.finditer(data):
+            yield data[start:match.start()]
+            start = match.end()
+        yield data[start:]
+        return
+
+    size = len(separator)
+    while True:
+        end = data.find(separator, start)
+        if end == -1:
+            yield data[start:]
+            return
+        yield data[start:end]
+        start = end + size
+
+
+def iter_lines(data):
+    """ Generate the lines of data, split at newline characters only
+    """
+    return iter_sections(data, '\n')
+
+
 def remove_command_from_config_list(interface, cmd, commands):
     # To delete the passed config
     if interface not in commands:
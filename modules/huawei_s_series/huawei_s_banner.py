@@ -91,6 +91,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import exec_command
 from ansible.module_utils.network.huawei_s_series.huawei_s import load_config
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 import re
 
 
@@ -158,6 +159,7 @@ def main():
     module = AnsibleModule(argument_spec=argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     warnings = list()
     check_args(module, warnings)
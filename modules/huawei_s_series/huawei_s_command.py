@@ -140,8 +140,9 @@ from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.common.parsing import Conditional
 from ansible.module_utils.network.common.utils import transform_commands, to_lines
-from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands
+from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands, get_timings, add_timings
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def parse_commands(module, warnings):
@@ -175,9 +176,11 @@ def main():
 
     module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True)
+    profile_module(module)
 
     warnings = list()
     result = {'changed': False, 'warnings': warnings}
+    timings = get_timings(module)
     check_args(module, warnings)
     commands = parse_commands(module, warnings)
 
@@ -193,14 +196,16 @@ def main():
     match = module.params['match']
 
     while retries > 0:
-        responses = run_commands(module, commands)
+        with timings.phase('fetch'):
+            responses = run_commands(module, commands)
 
-        for item in list(conditionals):
-            if item(responses):
-                if match == 'any':
-                    conditionals = list()
-                    break
-                conditionals.remove(item)
+        with timings.phase('parse'):
+            for item in list(conditionals):
+                if item(responses):
+                    if match == 'any':
+                        conditionals = list()
+                        break
+                    conditionals.remove(item)
 
         if not conditionals:
             break
@@ -213,12 +218,13 @@ def main():
         msg = 'One or more conditional statements have not been satisfied'
         module.fail_json(msg=msg, failed_conditions=failed_conditions)
 
-    result.update({
-        'stdout': responses,
-        'stdout_lines': list(to_lines(responses)),
-    })
+    with timings.phase('parse'):
+        result.update({
+            'stdout': responses,
+            'stdout_lines': list(to_lines(responses)),
+        })
 
-    module.exit_json(**result)
+    module.exit_json(**add_timings(module, result))
 
 
 if __name__ == '__main__':
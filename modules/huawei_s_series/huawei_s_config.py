@@ -143,7 +143,9 @@ options:
         startup-config and the I(modified) flag will always be set to
         True.  If the argument is set to I(modified), then the running-config
         will only be copied to the startup-config if it has changed since
-        the last save to startup-config.  If the argument is set to
+        the last save to startup-config.  The device is asked with
+        C(compare configuration) first and both configurations are only
+        downloaded and compared when it can not tell.  If the argument is set to
         I(never), the running-config will never be copied to the
         startup-config.  If the argument is set to I(changed), then the running-config
         will only be copied to the startup-config if the task has made a change.
@@ -202,6 +204,19 @@ options:
             in that case a I(backup) directory will be created in the current working directory
             and backup configuration will be copied in C(filename) within I(backup) directory.
         type: path
+      store:
+        description:
+          - When set to I(yes), C(dir_path) is used as a content addressed store instead of
+            a directory of timestamped files.  The configuration is named by its sha256
+            digest and only written when that digest is not stored yet, gzip compressed and
+            as a line delta against the previous backup of the same host where possible.
+            Every backup is recorded with its time and digest in
+            C(manifest/<ansible_host>.jsonl), named after the address the connection is
+            to like the C(config_format=digest) of M(huawei_s_facts). C(filename) is
+            ignored.  The stored objects are not configuration files, no C(backup_path)
+            is returned and the backup is identified by C(backup_digest).
+        type: bool
+        default: 'no'
     type: dict
     version_added: "2.8"
 """
@@ -283,6 +298,13 @@ EXAMPLES = """
     backup_options:
       filename: backup.cfg
       dir_path: /home/user
+
+- name: keep backups in a content addressed store
+  huawei_s_config:
+    backup: yes
+    backup_options:
+      dir_path: /var/backups/network
+      store: yes
 """
 
 RETURN = """
@@ -298,9 +320,14 @@ commands:
   sample: ['sysname foo', 'ospf 1', 'area 0.0.0.0']
 backup_path:
   description: The full path to the backup file
-  returned: when backup is yes
+  returned: when backup is yes and store is not set in backup options
   type: str
   sample: /playbooks/ansible/backup/huawei_s_config.2016-07-16@22:28:34
+backup_digest:
+  description: The sha256 digest the backup is stored under
+  returned: when backup is yes and store is set in backup options
+  type: str
+  sample: 930847c4f467a375c56a64202ba7b8b869e2914d01ef1b6a2845930d831dfb6b
 filename:
   description: The name of the backup file
   returned: when backup is yes and filename is not specified in backup options
@@ -324,14 +351,15 @@ time:
 """
 import json
 
-from ansible.module_utils._text import to_text
-from ansible.module_utils.connection import ConnectionError
-from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands, get_config
+from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands, get_config, get_timings, add_timings
 from ansible.module_utils.network.huawei_s_series.huawei_s import get_defaults_flag, get_connection
+from ansible.module_utils.network.huawei_s_series.huawei_s import is_config_modified
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec
 from ansible.module_utils.network.huawei_s_series.huawei_s import check_args as huawei_s_check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 from ansible.module_utils.basic import AnsibleModule
-from ansible.module_utils.network.common.config import NetworkConfig, dumps
+from ansible.module_utils.network.common.config import dumps
+from ansible.module_utils.network.huawei_s_series.utils.config_tree import ConfigTree, get_config_diff, get_ignore_matcher
 
 
 def check_args(module, warnings):
@@ -357,7 +385,7 @@ def get_candidate_config(module):
         candidate = module.params['src']
 
     elif module.params['lines']:
-        candidate_obj = NetworkConfig(indent=1)
+        candidate_obj = ConfigTree(indent=1)
         parents = module.params['parents'] or list()
         candidate_obj.add(module.params['lines'], parents=parents)
         candidate = dumps(candidate_obj, 'raw')
@@ -391,7 +419,8 @@ def main():
     """
     backup_spec = dict(
         filename=dict(),
-        dir_path=dict(type='path')
+        dir_path=dict(type='path'),
+        store=dict(type='bool', default=False)
     )
     argument_spec = dict(
         src=dict(type='path'),
@@ -432,24 +461,29 @@ def main():
                            mutually_exclusive=mutually_exclusive,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
     if module.params['diff_against'] != None:
         module._diff = True
 
     result = {'changed': False}
+    timings = get_timings(module)
 
     warnings = list()
     check_args(module, warnings)
     result['warnings'] = warnings
 
-    diff_ignore_lines = module.params['diff_ignore_lines']
+    # compile diff_ignore_lines once for every config parsed in this run
+    diff_ignore_lines = get_ignore_matcher(module.params['diff_ignore_lines'])
     config = None
     contents = None
     flags = get_defaults_flag(module) if module.params['defaults'] else []
     connection = get_connection(module)
 
     if module.params['backup'] or (module._diff and module.params['diff_against'] == 'running'):
-        contents = get_config(module, flags=flags)
-        config = NetworkConfig(indent=1, contents=contents)
+        with timings.phase('fetch'):
+            contents = get_config(module, flags=flags)
+        with timings.phase('parse'):
+            config = ConfigTree(indent=1, contents=contents)
         if module.params['backup']:
             result['__backup__'] = contents
 
@@ -459,12 +493,13 @@ def main():
         path = module.params['parents']
 
         candidate = get_candidate_config(module)
-        running = get_running_config(module, contents, flags=flags)
-        try:
-            response = connection.get_diff(candidate=candidate, running=running, diff_match=match, diff_ignore_lines=diff_ignore_lines, path=path,
-                                           diff_replace=replace)
-        except ConnectionError as exc:
-            module.fail_json(msg=to_text(exc, errors='surrogate_then_replace'))
+        with timings.phase('fetch'):
+            running = get_running_config(module, contents, flags=flags)
+        # the running config is already held by the module, diff it here
+        # rather than sending both configs over the connection socket
+        with timings.phase('diff'):
+            response = get_config_diff(candidate=candidate, running=running, diff_match=match, diff_ignore_lines=diff_ignore_lines, path=path,
+                                       diff_replace=replace)
 
         config_diff = response['config_diff']
         banner_diff = response['banner_diff']
@@ -485,10 +520,11 @@ def main():
             # send the configuration commands to the device and merge
             # them with the current running config
             if not module.check_mode:
-                if commands:
-                    edit_config_or_macro(connection, commands)
-                if banner_diff:
-                    connection.edit_banner(candidate=json.dumps(banner_diff), multiline_delimiter=module.params['multiline_delimiter'])
+                with timings.phase('push'):
+                    if commands:
+                        edit_config_or_macro(connection, commands)
+                    if banner_diff:
+                        connection.edit_banner(candidate=json.dumps(banner_diff), multiline_delimiter=module.params['multiline_delimiter'])
 
             result['changed'] = True
 
@@ -498,25 +534,22 @@ def main():
     if module.params['save_when'] == 'always':
         save_config(module, result)
     elif module.params['save_when'] == 'modified':
-        output = run_commands(module, ['display current-configuration', 'display saved-configuration'])
-
-        running_config = NetworkConfig(indent=1, contents=output[0], ignore_lines=diff_ignore_lines)
-        startup_config = NetworkConfig(indent=1, contents=output[1], ignore_lines=diff_ignore_lines)
-
-        if running_config.sha1 != startup_config.sha1:
+        if is_config_modified(module, diff_ignore_lines):
             save_config(module, result)
     elif module.params['save_when'] == 'changed' and result['changed']:
         save_config(module, result)
 
     if module._diff:
         if not running_config:
-            output = run_commands(module, 'display current-configuration')
+            with timings.phase('fetch'):
+                output = run_commands(module, 'display current-configuration')
             contents = output[0]
         else:
             contents = running_config
 
         # recreate the object in order to process diff_ignore_lines
-        running_config = NetworkConfig(indent=1, contents=contents, ignore_lines=diff_ignore_lines)
+        with timings.phase('parse'):
+            running_config = ConfigTree(indent=1, contents=contents, ignore_lines=diff_ignore_lines)
 
         if module.params['diff_against'] == 'running':
             if module.check_mode:
@@ -527,7 +560,8 @@ def main():
 
         elif module.params['diff_against'] == 'startup':
             if not startup_config:
-                output = run_commands(module, 'display saved-configuration')
+                with timings.phase('fetch'):
+                    output = run_commands(module, 'display saved-configuration')
                 contents = output[0]
             else:
                 contents = startup_config.config_text
@@ -536,7 +570,8 @@ def main():
             contents = module.params['intended_config']
 
         if contents is not None:
-            base_config = NetworkConfig(indent=1, contents=contents, ignore_lines=diff_ignore_lines)
+            with timings.phase('parse'):
+                base_config = ConfigTree(indent=1, contents=contents, ignore_lines=diff_ignore_lines)
 
             if running_config.sha1 != base_config.sha1:
                 if module.params['diff_against'] == 'intended':
@@ -551,7 +586,7 @@ def main():
                     'diff': {'before': str(before), 'after': str(after)}
                 })
 
-    module.exit_json(**result)
+    module.exit_json(**add_timings(module, result))
 
 
 if __name__ == '__main__':
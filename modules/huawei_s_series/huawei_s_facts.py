@@ -57,8 +57,54 @@ options:
         a specific subset should not be collected.
         Valid subsets are 'all', 'interfaces', 'l2_interfaces', 'vlans',
         'lag_interfaces', 'lacp', 'lacp_interfaces', 'lldp_global',
-        'lldp_interfaces', 'l3_interfaces'.
+        'lldp_interfaces', 'l3_interfaces', 'mac_address_table'.
+      - C(mac_address_table) is not part of C(all), it is only gathered
+        when named, see M(huawei_s_mac_address_table).
     version_added: "2.9"
+  incremental:
+    description:
+      - When set, the device is first asked when its configuration changed
+        last. The resources that only derive from the configuration,
+        all but C(interfaces), are returned from a facts cache kept on the
+        controller when it did not change since they were cached, and
+        gathered from the device otherwise.
+      - The cache has a file per host in C(~/.ansible/huawei_s/facts), or
+        in the directory set in C(HUAWEI_S_FACTS_CACHE).
+      - The resources gathered from the device are stored in the cache
+        whether this is set or not, for the C(facts_ttl) of the resource
+        modules.
+    type: bool
+    default: no
+  config_format:
+    description:
+      - How the C(config) subset returns the configuration.
+      - With C(text) the whole configuration is returned in
+        C(ansible_net_config).
+      - With C(digest) it is put in the config store on the controller and
+        only its digest, size and line count are returned. Read it back with
+        ConfigStore.get() from module_utils/huawei_s_series/utils/store.py.
+    type: str
+    choices: ['text', 'digest']
+    default: text
+  config_store:
+    description:
+      - The directory of the config store C(config_format=digest) writes to.
+        The configuration is stored under the address the connection is
+        to, like the backups of M(huawei_s_config) with C(store).
+      - Defaults to C(~/.ansible/huawei_s/config_store), or the directory set in
+        C(HUAWEI_S_CONFIG_STORE).
+    type: path
+  lldp_neighbor_detail:
+    description:
+      - The C(interfaces) subset takes the host and port of the LLDP
+        neighbors from C(display lldp neighbor brief). The interfaces
+        listed here are looked up with C(display lldp neighbor interface)
+        instead, which gives the system name and port ID in full.
+      - C(all) looks up every neighbor with the verbose
+        C(display lldp neighbor), which is slow on switches with many
+        neighbors.
+    type: list
+    default: []
 """
 
 EXAMPLES = """
@@ -104,6 +150,24 @@ EXAMPLES = """
     gather_subset: min
     gather_network_resources: l3_interfaces
 
+- name: Gather all resources, unchanged configuration resources from the cache
+  huawei_s_facts:
+    gather_subset: min
+    gather_network_resources: all
+    incremental: yes
+
+- name: Gather the config subset as a digest, keeping the text on the controller
+  huawei_s_facts:
+    gather_subset: config
+    config_format: digest
+
+- name: Gather LLDP neighbors, with the full detail for the uplinks only
+  huawei_s_facts:
+    gather_subset: interfaces
+    lldp_neighbor_detail:
+      - GigabitEthernet0/0/47
+      - GigabitEthernet0/0/48
+
 """
 
 RETURN = """
@@ -117,6 +181,11 @@ ansible_net_gather_network_resources:
   returned: when the resource is configured
   type: list
 
+ansible_net_cached_network_resources:
+  description: The network resource subsets returned from the facts cache
+  returned: when incremental is set
+  type: list
+
 # default
 ansible_net_model:
   description: The model name returned from the device
@@ -176,11 +245,34 @@ ansible_net_memtotal_mb:
   description: The total memory on the remote device in Mb
   returned: when hardware is configured
   type: int
+ansible_net_stacked_memory:
+  description:
+    - The total and free memory in Mb of each member of a stack, by slot.
+      The flash of the members is in C(ansible_net_filesystems_info) as
+      C(slot<N>#flash:).
+  returned: when hardware is configured and the device is a stack
+  type: dict
 
 # config
 ansible_net_config:
   description: The current active config from the device
-  returned: when config is configured
+  returned: when config is configured and config_format is text
+  type: str
+ansible_net_config_digest:
+  description: The sha256 digest the current active config is stored under
+  returned: when config is configured and config_format is digest
+  type: str
+ansible_net_config_size:
+  description: The size of the current active config in bytes
+  returned: when config is configured and config_format is digest
+  type: int
+ansible_net_config_lines:
+  description: The number of lines of the current active config
+  returned: when config is configured and config_format is digest
+  type: int
+ansible_net_config_store:
+  description: The config store the current active config was put in
+  returned: when config is configured and config_format is digest
   type: str
 
 # interfaces
@@ -207,7 +299,8 @@ ansible_net_neighbors:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.facts.facts import FactsArgs
 from ansible.module_utils.network.huawei_s_series.facts.facts import Facts
-from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec
+from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, get_timings, add_timings
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -218,16 +311,19 @@ def main():
 
     module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True)
+    profile_module(module)
 
     warnings = ['default value for `gather_subset` '
                 'will be changed to `min` from `!config` v2.11 onwards']
 
-    result = Facts(module).get_facts()
+    get_timings(module)
+    # what is gathered here is served to the facts_ttl of the resource modules
+    result = Facts(module, write_cache=True).get_facts()
 
     ansible_facts, additional_warnings = result
     warnings.extend(additional_warnings)
 
-    module.exit_json(ansible_facts=ansible_facts, warnings=warnings)
+    module.exit_json(**add_timings(module, dict(ansible_facts=ansible_facts, warnings=warnings)))
 
 
 if __name__ == '__main__':
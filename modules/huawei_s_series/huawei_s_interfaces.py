@@ -44,6 +44,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
 - Tested against VRP V200R010C00SPC600
 - This module works with connection C(network_cli).
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of interface options
@@ -379,6 +380,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.interfaces.interfaces import InterfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.interfaces.interfaces import Interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -394,6 +396,7 @@ def main():
     module = AnsibleModule(argument_spec=InterfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Interfaces(module).execute_module()
     module.exit_json(**result)
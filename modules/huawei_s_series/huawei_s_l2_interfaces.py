@@ -45,6 +45,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli).
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of Layer-2 interface options
@@ -268,6 +269,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.l2_interfaces.l2_interfaces import L2_InterfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.l2_interfaces.l2_interfaces import L2_Interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -283,6 +285,7 @@ def main():
     module = AnsibleModule(argument_spec=L2_InterfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = L2_Interfaces(module).execute_module()
     module.exit_json(**result)
@@ -45,6 +45,7 @@ description:
 - This module provides declarative management of Layer-3 interface
   on Huawei S Series devices.
 author: Aleksandr Natov (@pahedu)
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of Layer-3 interface options
@@ -291,6 +292,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.l3_interfaces.l3_interfaces import L3_InterfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.l3_interfaces.l3_interfaces import L3_Interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -305,6 +307,7 @@ def main():
     module = AnsibleModule(argument_spec=L3_InterfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = L3_Interfaces(module).execute_module()
     module.exit_json(**result)
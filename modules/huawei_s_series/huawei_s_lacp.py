@@ -45,6 +45,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli),
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: The provided configurations.
@@ -168,6 +169,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.lacp.lacp import LacpArgs
 from ansible.module_utils.network.huawei_s_series.config.lacp.lacp import Lacp
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -182,6 +184,7 @@ def main():
     module = AnsibleModule(argument_spec=LacpArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Lacp(module).execute_module()
     module.exit_json(**result)
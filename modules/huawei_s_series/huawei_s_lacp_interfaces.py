@@ -46,6 +46,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli),
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
       description: A dictionary of LACP lacp_interfaces option
@@ -308,6 +309,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.lacp_interfaces.lacp_interfaces import Lacp_InterfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.lacp_interfaces.lacp_interfaces import Lacp_Interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -323,6 +325,7 @@ def main():
     module = AnsibleModule(argument_spec=Lacp_InterfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Lacp_Interfaces(module).execute_module()
     module.exit_json(**result)
@@ -45,6 +45,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli).
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A list of link aggregation group configurations.
@@ -416,6 +417,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.lag_interfaces.lag_interfaces import Lag_interfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.lag_interfaces.lag_interfaces import Lag_interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -430,6 +432,7 @@ def main():
     module = AnsibleModule(argument_spec=Lag_interfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Lag_interfaces(module).execute_module()
     module.exit_json(**result)
@@ -57,6 +57,7 @@ import re
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.huawei_s import load_config, run_commands
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def has_lldp(module):
@@ -84,6 +85,7 @@ def main():
 
     module = AnsibleModule(argument_spec=argument_spec,
                            supports_check_mode=True)
+    profile_module(module)
 
     warnings = list()
 
@@ -44,6 +44,7 @@ author: Sumit Jaiswal (@justjais)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli),
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of LLDP options
@@ -198,6 +199,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.lldp_global.lldp_global import Lldp_globalArgs
 from ansible.module_utils.network.huawei_s_series.config.lldp_global.lldp_global import Lldp_global
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -212,6 +214,7 @@ def main():
     module = AnsibleModule(argument_spec=Lldp_globalArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Lldp_global(module).execute_module()
     module.exit_json(**result)
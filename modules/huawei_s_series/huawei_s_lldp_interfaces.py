@@ -46,6 +46,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli),
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of LLDP options
@@ -250,6 +251,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.lldp_interfaces.lldp_interfaces import Lldp_InterfacesArgs
 from ansible.module_utils.network.huawei_s_series.config.lldp_interfaces.lldp_interfaces import Lldp_Interfaces
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -265,6 +267,7 @@ def main():
     module = AnsibleModule(argument_spec=Lldp_InterfacesArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Lldp_Interfaces(module).execute_module()
     module.exit_json(**result)
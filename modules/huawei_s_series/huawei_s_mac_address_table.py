@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+The module file for huawei_s_mac_address_table
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    'metadata_version': '1.1',
+    'status': ['preview'],
+    'supported_by': 'community'
+}
+
+DOCUMENTATION = """
+---
+module: huawei_s_mac_address_table
+version_added: 2.9
+short_description: Gets the MAC address table of Huawei S Series switches
+description:
+  - Collects the MAC address table with C(display mac-address), filtered on
+    the device by VLAN and interface when they are given.
+  - The table is returned in a compact form, one list per field, with the
+    MAC addresses as integers and the interfaces and entry types as indexes
+    into the C(interfaces) and C(types) lists. Set I(expand) to get a list
+    of entries instead.
+  - The C(mac_address_table) resource of M(huawei_s_facts) returns the same
+    table. It is not part of C(all) and is only gathered when named.
+author: Aleksandr Natov (@pahedu)
+options:
+  vlans:
+    description:
+      - Only collect the entries of these VLANs.
+    type: list
+    elements: int
+  interfaces:
+    description:
+      - Only collect the entries learned on these interfaces, each is
+        fetched with C(display mac-address <interface>). With I(vlans)
+        too, every interface is fetched for every VLAN.
+    type: list
+    elements: str
+  expand:
+    description:
+      - Return the table as a list of entries with the MAC address in
+        C(xxxx-xxxx-xxxx) notation rather than in the compact form.
+    type: bool
+    default: no
+"""
+
+EXAMPLES = """
+- name: Get the MAC address table
+  huawei_s_mac_address_table:
+  register: result
+
+- name: Get the entries of VLANs 10 and 20 on two ports as a list
+  huawei_s_mac_address_table:
+    vlans:
+      - 10
+      - 20
+    interfaces:
+      - GigabitEthernet0/0/1
+      - Eth-Trunk1
+    expand: yes
+
+- name: Gather the table with the resource facts
+  huawei_s_facts:
+    gather_subset: min
+    gather_network_resources:
+      - all
+      - mac_address_table
+"""
+
+RETURN = """
+mac_address_table:
+  description:
+    - The MAC address table, compact unless I(expand) is set.
+    - The entry at position N is C(macs[N]) in C(vlans[N]), learned on
+      C(interfaces[interface_index[N]]), of type C(types[type_index[N]]).
+      The VLAN is 0 for entries not in a VLAN.
+  returned: always
+  type: complex
+  contains:
+    macs:
+      description: The MAC addresses as integers.
+      type: list
+      sample: [159527812225, 159527812226]
+    vlans:
+      description: The VLANs of the entries.
+      type: list
+      sample: [10, 20]
+    interface_index:
+      description: The index of the interface of the entries.
+      type: list
+      sample: [0, 1]
+    type_index:
+      description: The index of the type of the entries.
+      type: list
+      sample: [0, 1]
+    interfaces:
+      description: The interfaces the entries were learned on.
+      type: list
+      sample: ['GigabitEthernet0/0/1', 'Eth-Trunk1']
+    types:
+      description: The entry types.
+      type: list
+      sample: ['dynamic', 'static', 'blackhole', 'security', 'sec-config', 'sticky']
+    count:
+      description: The number of entries.
+      type: int
+      sample: 2
+  sample:
+    - mac: 0025-9e95-7c31
+      vlan: 10
+      interface: GigabitEthernet0/0/1
+      type: dynamic
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible.module_utils.network.huawei_s_series.argspec.mac_address_table.mac_address_table import Mac_address_tableArgs
+from ansible.module_utils.network.huawei_s_series.facts.mac_address_table.mac_address_table import Mac_address_tableFacts, expand_mac_table
+from ansible.module_utils.network.huawei_s_series.huawei_s import get_timings, add_timings
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
+
+
+def main():
+    """
+    Main entry point for module execution
+
+    :returns: the result form module invocation
+    """
+    module = AnsibleModule(argument_spec=Mac_address_tableArgs.argument_spec,
+                           supports_check_mode=True)
+    profile_module(module)
+
+    get_timings(module)
+    facts = {'ansible_network_resources': {}}
+    Mac_address_tableFacts(module).populate_facts(None, facts)
+    table = facts['ansible_network_resources']['mac_address_table']
+    if module.params['expand']:
+        table = expand_mac_table(table)
+
+    module.exit_json(**add_timings(module, {'changed': False, 'mac_address_table': table}))
+
+
+if __name__ == '__main__':
+    main()
@@ -87,6 +87,7 @@ import re
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.huawei_s import get_config, load_config
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def parse_server(line, dest):
@@ -260,6 +261,7 @@ def main():
         argument_spec=argument_spec,
         supports_check_mode=True
     )
+    profile_module(module)
 
     result = {'changed': False}
 
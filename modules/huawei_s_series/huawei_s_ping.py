@@ -107,6 +107,7 @@ rtt:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.huawei_s import run_commands
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 import re
 
 
@@ -124,6 +125,7 @@ def main():
     argument_spec.update(huawei_s_argument_spec)
 
     module = AnsibleModule(argument_spec=argument_spec)
+    profile_module(module)
 
     count = module.params["count"]
     dest = module.params["dest"]
@@ -133,6 +133,7 @@ from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.common.utils import remove_default_spec, validate_ip_address
 from ansible.module_utils.network.huawei_s_series.huawei_s import get_config, load_config
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_argument_spec, check_args
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def map_obj_to_commands(want, have):
@@ -304,6 +305,7 @@ def main():
                            required_one_of=required_one_of,
                            mutually_exclusive=mutually_exclusive,
                            supports_check_mode=True)
+    profile_module(module)
 
     warnings = list()
     check_args(module, warnings)
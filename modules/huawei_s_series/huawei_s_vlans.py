@@ -45,6 +45,7 @@ author: Aleksandr Natov (@pahedu)
 notes:
   - Tested against VRP V200R010C00SPC600
   - This module works with connection C(network_cli).
+extends_documentation_fragment: huawei_s.facts_ttl
 options:
   config:
     description: A dictionary of VLANs options
@@ -510,6 +511,7 @@ commands:
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.network.huawei_s_series.argspec.vlans.vlans import VlansArgs
 from ansible.module_utils.network.huawei_s_series.config.vlans.vlans import Vlans
+from ansible.module_utils.network.huawei_s_series.huawei_s import profile_module
 
 
 def main():
@@ -525,6 +527,7 @@ def main():
     module = AnsibleModule(argument_spec=VlansArgs.argument_spec,
                            required_if=required_if,
                            supports_check_mode=True)
+    profile_module(module)
 
     result = Vlans(module).execute_module()
     module.exit_json(**result)
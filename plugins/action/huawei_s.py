@@ -19,20 +19,311 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
+import os
 import re
 import sys
 import copy
+import errno
+import fcntl
+import glob
+import hashlib
+import json
+import pty
+import subprocess
+import termios
+import time
 
-from ansible.module_utils._text import to_text
-from ansible.module_utils.connection import Connection, ConnectionError
+from contextlib import contextmanager
+
+from ansible import constants as C
+from ansible.errors import AnsibleError
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.connection import Connection, ConnectionError, write_to_file_descriptor
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six.moves import cPickle
 from ansible.plugins.action.network import ActionModule as ActionNetworkModule
+from ansible.plugins.loader import become_loader, cliconf_loader, connection_loader, terminal_loader
 from ansible.module_utils.network.common.utils import load_provider
 from ansible.module_utils.network.huawei_s_series.huawei_s import huawei_s_provider_spec
+from ansible.module_utils.network.huawei_s_series.utils.cache import JsonFileCache
+from ansible.module_utils.network.huawei_s_series.utils.store import ConfigStore
 from ansible.utils.display import Display
+from ansible.utils.path import unfrackpath
 
 display = Display()
 
 
+# with HUAWEI_S_SESSION_DAEMON set, provider sessions do not belong to a
+# playbook run, they stay open across runs until idle for
+# HUAWEI_S_SESSION_IDLE_TIMEOUT seconds, at most
+# HUAWEI_S_SESSION_MAX_PER_HOST of them per host
+SESSION_DAEMON = boolean(os.environ.get('HUAWEI_S_SESSION_DAEMON', False), strict=False)
+SESSION_IDLE_TIMEOUT = int(os.environ.get('HUAWEI_S_SESSION_IDLE_TIMEOUT', 900))
+SESSION_MAX_PER_HOST = int(os.environ.get('HUAWEI_S_SESSION_MAX_PER_HOST', 2))
+
+# stands in for the playbook pid in the socket names of daemon sessions
+SESSION_ID = 'huawei_s-session'
+
+
+@contextmanager
+def file_lock(lock_path):
+    """ The lock ansible-connection holds on a socket while it checks for
+    and starts the connection behind it
+    """
+    lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.lockf(lock_fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.lockf(lock_fd, fcntl.LOCK_UN)
+        os.close(lock_fd)
+
+
+def pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as exc:
+        return exc.errno != errno.ESRCH
+    return True
+
+
+def start_session(play_context, variables, session_id):
+    """ Start ansible-connection for a session that is not tied to the
+    playbook pid and return its socket path
+
+    This is task_executor.start_connection() with session_id passed where
+    it passes the pid of ansible-playbook.
+    """
+    candidate_paths = [C.ANSIBLE_CONNECTION_PATH or os.path.dirname(sys.argv[0])]
+    candidate_paths.extend(os.environ['PATH'].split(os.pathsep))
+    for dirname in candidate_paths:
+        ansible_connection = os.path.join(dirname, 'ansible-connection')
+        if os.path.isfile(ansible_connection):
+            break
+    else:
+        raise AnsibleError("Unable to find location of 'ansible-connection'. "
+                           "Please set or check the value of ANSIBLE_CONNECTION_PATH")
+
+    env = os.environ.copy()
+    env.update({
+        'ANSIBLE_BECOME_PLUGINS': become_loader.print_paths(),
+        'ANSIBLE_CLICONF_PLUGINS': cliconf_loader.print_paths(),
+        'ANSIBLE_CONNECTION_PLUGINS': connection_loader.print_paths(),
+        'ANSIBLE_TERMINAL_PLUGINS': terminal_loader.print_paths(),
+    })
+    master, slave = pty.openpty()
+    p = subprocess.Popen(
+        [sys.executable, ansible_connection, to_text(session_id), ''],
+        stdin=slave, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env
+    )
+    os.close(slave)
+
+    # noncanonical mode, so lines longer than 4095 characters get through
+    old = termios.tcgetattr(master)
+    new = termios.tcgetattr(master)
+    new[3] = new[3] & ~termios.ICANON
+
+    try:
+        termios.tcsetattr(master, termios.TCSANOW, new)
+        write_to_file_descriptor(master, variables)
+        write_to_file_descriptor(master, play_context.serialize())
+
+        (stdout, stderr) = p.communicate()
+    finally:
+        termios.tcsetattr(master, termios.TCSANOW, old)
+    os.close(master)
+
+    try:
+        result = json.loads(to_text(stdout if p.returncode == 0 else stderr, errors='surrogate_then_replace'))
+    except ValueError:
+        result = {'error': to_text(stderr, errors='surrogate_then_replace')}
+
+    for level, message in result.get('messages', []):
+        display.vvvv(message, host=play_context.remote_addr)
+
+    if 'error' in result:
+        raise AnsibleError(result['error'])
+
+    return result['socket_path']
+
+
+class ConnectionPool(object):
+    """ The provider connections of a playbook run
+
+    ansible-connection names its socket after host, port, user and the
+    playbook pid.  The provider values are normalized first so equivalent
+    providers share one socket, and a socket that already exists is
+    attached to directly instead of starting ansible-connection again.
+    A provider with an SSH key file gets a socket of its own, named after
+    the playbook pid and the key file.  Reuse counters are kept next to
+    the sockets for the playbook run, those of finished runs are removed.
+
+    In daemon mode the sockets are named after SESSION_ID instead of the
+    playbook pid, so later runs find them.  A session is health checked
+    before it is reused, and the least recently used sessions of a host
+    are closed when more than SESSION_MAX_PER_HOST are open.
+    """
+
+    def __init__(self, connection_loader, playbook_pid=None, daemon=None):
+        self._connection_loader = connection_loader
+        self.daemon = SESSION_DAEMON if daemon is None else daemon
+        self.directory = unfrackpath(C.PERSISTENT_CONTROL_PATH_DIR)
+        if self.daemon:
+            self.playbook_pid = SESSION_ID
+            self._stats = JsonFileCache(os.path.join(self.directory, '.huawei_s_sessions.json'))
+        else:
+            # the worker runs under ansible-playbook, as does start_connection()
+            self.playbook_pid = playbook_pid or os.getppid()
+            self._stats = JsonFileCache(os.path.join(self.directory, '.huawei_s_pool_%s.json' % self.playbook_pid))
+            self._remove_stale_stats()
+
+    def _remove_stale_stats(self):
+        """ Remove the counters of playbook runs that are gone
+        """
+        for path in glob.glob(os.path.join(self.directory, '.huawei_s_pool_*.json')):
+            pid = os.path.basename(path)[len('.huawei_s_pool_'):-len('.json')]
+            if pid.isdigit() and not pid_exists(int(pid)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def normalize(pc):
+        pc.remote_addr = to_text(pc.remote_addr).strip().lower()
+        pc.port = int(pc.port or 22)
+        if pc.private_key_file:
+            pc.private_key_file = unfrackpath(pc.private_key_file)
+        return pc
+
+    @staticmethod
+    def key(pc):
+        key = '%s@%s:%s' % (pc.remote_user, pc.remote_addr, pc.port)
+        if pc.private_key_file:
+            key += ' %s' % pc.private_key_file
+        return key
+
+    def session_id(self, pc):
+        """ What stands for the playbook pid in the socket name of pc,
+        the control path hashes host, port and user only
+        """
+        if not pc.private_key_file:
+            return self.playbook_pid
+        digest = hashlib.sha1(to_bytes(pc.private_key_file, errors='surrogate_or_strict')).hexdigest()
+        return '%s-%s' % (self.playbook_pid, digest[:12])
+
+    def socket_path(self, pc):
+        ssh = self._connection_loader.get('ssh', class_only=True)
+        cp = ssh._create_control_path(pc.remote_addr, pc.port, pc.remote_user, pc.connection, self.session_id(pc))
+        return unfrackpath(cp % dict(directory=self.directory))
+
+    @staticmethod
+    def lock_path(socket_path):
+        return unfrackpath("%s/.ansible_pc_lock_%s" % os.path.split(socket_path))
+
+    def _variables(self, variables):
+        if self.daemon:
+            # persistent_connect_timeout is the idle time after which
+            # ansible-connection exits, it has to be sent on every update
+            variables = dict(variables, ansible_connect_timeout=SESSION_IDLE_TIMEOUT)
+        return variables
+
+    def attach(self, pc, variables, task_uuid=''):
+        """ Return the path of the existing socket for pc, or None
+
+        The socket gets the same updates ansible-connection sends when it
+        finds an existing socket, under the lock ansible-connection takes,
+        so a connection being started for it is waited for.  A socket
+        nobody listens on any more is removed.
+        """
+        socket_path = self.socket_path(pc)
+        if not os.path.exists(socket_path):
+            return None
+
+        with file_lock(self.lock_path(socket_path)):
+            if not os.path.exists(socket_path):
+                return None
+            conn = Connection(socket_path)
+            try:
+                conn.set_options(var_options=self._variables(variables))
+                conn.update_play_context(to_text(cPickle.dumps(pc.serialize(), protocol=0)))
+                conn.set_check_prompt(task_uuid)
+                if self.daemon and not conn.check_session():
+                    # the session may have sat idle for long, make sure the
+                    # device still answers before a task relies on it
+                    raise ConnectionError('the device closed the session')
+                for level, message in conn.pop_messages():
+                    display.vvvv(message, host=pc.remote_addr)
+            except ConnectionError as exc:
+                display.vvvv('unable to reuse socket %s: %s' % (socket_path, to_text(exc)), pc.remote_addr)
+                self.evict(socket_path, stale=getattr(exc, 'err', None) is not None)
+                return None
+        return socket_path
+
+    def open(self, pc, connection, variables):
+        """ Start a new connection for pc and return its socket path
+
+        ansible-connection takes the lock of the socket itself, it must not
+        be held here.
+        """
+        session_id = self.session_id(pc)
+        if session_id == self.playbook_pid and not self.daemon:
+            return connection.run()
+
+        socket_path = start_session(pc, self._variables(variables), session_id)
+        if self.daemon:
+            self.enforce_cap(pc)
+        return socket_path
+
+    def evict(self, socket_path, stale=False):
+        """ Close the session behind socket_path, or remove it if stale
+        """
+        if not stale:
+            try:
+                Connection(socket_path).close()
+            except ConnectionError:
+                stale = True
+            else:
+                # ansible-connection removes the socket once it has
+                # answered, a session opened meanwhile would find it
+                deadline = time.time() + 2
+                while os.path.exists(socket_path) and time.time() < deadline:
+                    time.sleep(0.05)
+        if stale:
+            for path in (socket_path, self.lock_path(socket_path)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def enforce_cap(self, pc):
+        """ Close the least recently used sessions of the host of pc over
+        SESSION_MAX_PER_HOST, the current session is kept
+        """
+        current = self.key(pc)
+        sessions = sorted((entry.get('last_used', 0), key, entry) for key, entry in self._stats.load().items()
+                          if key != current and entry.get('host') == pc.remote_addr
+                          and os.path.exists(entry.get('socket_path', '')))
+        for last_used, key, entry in sessions[:max(0, len(sessions) + 1 - SESSION_MAX_PER_HOST)]:
+            display.vvv('closing session %s, more than %d open to %s' % (key, SESSION_MAX_PER_HOST, pc.remote_addr))
+            self.evict(entry['socket_path'])
+
+    def record(self, pc, reused):
+        """ Count a task for the connection of pc and return its counters
+        """
+        key = self.key(pc)
+        entry = dict(self._stats.load().get(key, {'opened': 0, 'reused': 0}))
+        entry['reused' if reused else 'opened'] += 1
+        if self.daemon:
+            entry.update(host=pc.remote_addr, socket_path=self.socket_path(pc), last_used=time.time())
+        try:
+            self._stats.update(key, entry)
+        except (IOError, OSError):
+            # the counters are informational, never fail the task for them
+            pass
+        return entry
+
+
 class ActionModule(ActionNetworkModule):
 
     def run(self, tmp=None, task_vars=None):
@@ -41,6 +332,10 @@ class ActionModule(ActionNetworkModule):
         module_name = self._task.action.split('.')[-1]
         self._config_module = True if module_name == 'huawei_s_config' else False
         socket_path = None
+        daemon_session = False
+        # the address the connection is to, the config store keeps the
+        # backups under it like the huawei_s_facts config subset does
+        self._remote_addr = self._play_context.remote_addr
 
         if self._play_context.connection == 'network_cli':
             provider = self._task.args.get('provider', {})
@@ -53,7 +348,7 @@ class ActionModule(ActionNetworkModule):
             pc.connection = 'network_cli'
             pc.network_os = 'huawei_s'
             pc.remote_addr = provider['host'] or self._play_context.remote_addr
-            pc.port = int(provider['port'] or self._play_context.port or 22)
+            pc.port = provider['port'] or self._play_context.port
             pc.remote_user = provider['username'] or self._play_context.connection_user
             pc.password = provider['password'] or self._play_context.password
             pc.private_key_file = provider['ssh_keyfile'] or self._play_context.private_key_file
@@ -62,19 +357,31 @@ class ActionModule(ActionNetworkModule):
                 pc.become_method = 'enable'
             pc.become_pass = provider['auth_pass']
 
+            pool = ConnectionPool(self._shared_loader_obj.connection_loader)
+            pool.normalize(pc)
+            self._remote_addr = pc.remote_addr
+
             display.vvv('using connection plugin %s (was local)' % pc.connection, pc.remote_addr)
             connection = self._shared_loader_obj.connection_loader.get('persistent', pc, sys.stdin)
 
             command_timeout = int(provider['timeout']) if provider['timeout'] else connection.get_option('persistent_command_timeout')
             connection.set_options(direct={'persistent_command_timeout': command_timeout})
 
-            socket_path = connection.run()
+            socket_path = pool.attach(pc, {'ansible_command_timeout': command_timeout})
+            reused = socket_path is not None
+            if not reused:
+                socket_path = pool.open(pc, connection, {'ansible_command_timeout': command_timeout})
             display.vvvv('socket_path: %s' % socket_path, pc.remote_addr)
             if not socket_path:
                 return {'failed': True,
                         'msg': 'unable to open shell. Please see: ' +
                                'https://docs.ansible.com/ansible/network_debug_troubleshooting.html#unable-to-open-shell'}
 
+            daemon_session = pool.daemon
+            stats = pool.record(pc, reused)
+            display.vvv('%s connection %s, opened %d reused %d times'
+                        % ('reusing' if reused else 'opened', pool.key(pc), stats['opened'], stats['reused']), pc.remote_addr)
+
             task_vars['ansible_socket'] = socket_path
         else:
             return {'failed': True, 'msg': 'Connection type %s is not valid for this module' % self._play_context.connection}
@@ -93,5 +400,36 @@ class ActionModule(ActionNetworkModule):
         except ConnectionError as exc:
             return {'failed': True, 'msg': to_text(exc)}
 
-        result = super(ActionModule, self).run(task_vars=task_vars)
+        try:
+            result = super(ActionModule, self).run(task_vars=task_vars)
+        finally:
+            if daemon_session:
+                # the strategy resets the sockets it finds in the task args
+                # when the play ends, which would close the session
+                self._task.args.pop('_ansible_socket', None)
         return result
+
+    def _handle_backup_option(self, result, task_vars):
+        backup_options = self._task.args.get('backup_options') or {}
+        if not boolean(backup_options.get('store', False), strict=False):
+            return super(ActionModule, self)._handle_backup_option(result, task_vars)
+
+        try:
+            content = result.pop('__backup__')
+        except KeyError:
+            raise AnsibleError('Failed while reading configuration backup')
+
+        backup_path = backup_options.get('dir_path')
+        if not backup_path:
+            backup_path = os.path.join(self._get_working_path(), 'backup')
+
+        store = ConfigStore(backup_path)
+        digest, written = store.put(self._remote_addr, content)
+        display.vvvv('backup %s %s in store %s' % (digest, 'written' if written else 'unchanged', store.path),
+                     self._play_context.remote_addr)
+
+        # the object is a compressed delta, not a file to restore from,
+        # the backup is identified by its digest alone
+        result['backup_digest'] = digest
+        if written:
+            result['changed'] = True
@@ -0,0 +1,273 @@
+#
+# (c) 2019 Red Hat Inc.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+DOCUMENTATION = """
+---
+author: Aleksandr Natov (@pahedu)
+callback: huawei_s_metrics
+type: aggregate
+short_description: Aggregate huawei_s command latencies into Prometheus textfile metrics
+description:
+  - This callback collects the command timings the huawei_s cliconf plugin
+    returns in the C(timings) key of the huawei_s module results, and the
+    terminal error patterns failed commands matched.
+  - Latencies are aggregated into histograms per command and switch model.
+    When a play starts and when the run ends, they are written as a
+    Prometheus textfile (for the node_exporter textfile collector) and a
+    JSON summary with p50 and p99 estimates.
+  - Whitelisting it changes the results of the huawei_s modules. Unless
+    C(HUAWEI_S_TIMINGS) is already set, it sets it for the run, so every
+    huawei_s module makes two more calls to its persistent connection, for
+    the timings and the device model, and returns a C(timings) key.
+    Setting C(HUAWEI_S_TIMINGS=no) keeps the results as they were, and
+    leaves this callback with nothing to collect.
+  - The commands run_commands_parallel hands to secondary sessions
+    (C(HUAWEI_S_CHANNELS)) are timed and counted like the others.
+version_added: "2.9"
+requirements:
+  - whitelisting in configuration
+options:
+  output_dir:
+    description: Directory the metrics files are written to.
+    default: ~/.ansible/huawei_s/metrics
+    env:
+      - name: HUAWEI_S_METRICS_DIR
+    ini:
+      - section: callback_huawei_s_metrics
+        key: output_dir
+  buckets:
+    description: Upper bounds in seconds of the latency histogram buckets.
+    type: list
+    default: [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+    env:
+      - name: HUAWEI_S_METRICS_BUCKETS
+    ini:
+      - section: callback_huawei_s_metrics
+        key: buckets
+"""
+
+EXAMPLES = """
+example: >
+  To enable, add this to your ansible.cfg file in the defaults block
+    [defaults]
+    callback_whitelist = huawei_s_metrics
+"""
+
+import json
+import os
+import time
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.network.huawei_s_series.utils.store import write_atomic
+from ansible.plugins.callback import CallbackBase
+from ansible.plugins.loader import terminal_loader
+
+
+def command_name(command):
+    """ The command without its arguments, 'display interface brief
+    GE0/0/1' is counted as 'display interface'
+    """
+    return ' '.join(command.split()[:2])
+
+
+class Histogram(object):
+    """ A cumulative latency histogram like Prometheus keeps
+    """
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """ Estimate quantile q by linear interpolation within the bucket,
+        the way histogram_quantile() does
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                upper = self.buckets[index]
+                return round(lower + (upper - lower) * (rank - seen) / count, 6)
+            seen += count
+            if index < len(self.buckets):
+                lower = self.buckets[index]
+        return self.buckets[-1]
+
+
+class CallbackModule(CallbackBase):
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = 'aggregate'
+    CALLBACK_NAME = 'huawei_s_metrics'
+    CALLBACK_NEEDS_WHITELIST = True
+
+    def __init__(self):
+        super(CallbackModule, self).__init__()
+        self._histograms = dict()
+        self._errors = dict()
+        self._bytes = dict()
+        self._dirty = False
+        self._error_patterns = None
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(CallbackModule, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self.output_dir = os.path.expanduser(self.get_option('output_dir'))
+        self.bucket_bounds = sorted(float(bound) for bound in self.get_option('buckets'))
+        # only a whitelisted callback gets its options set, this must happen
+        # before the workers fork for the modules to return timings and adds
+        # a `timings` key to their results, see DOCUMENTATION
+        os.environ.setdefault('HUAWEI_S_TIMINGS', '1')
+
+    def _histogram(self, name, model):
+        key = (name, model)
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(self.bucket_bounds)
+        return self._histograms[key]
+
+    def _count_error(self, pattern, model):
+        key = (pattern, model)
+        self._errors[key] = self._errors.get(key, 0) + 1
+
+    def _match_error(self, text):
+        if self._error_patterns is None:
+            terminal = terminal_loader.get('huawei_s', class_only=True)
+            self._error_patterns = terminal.terminal_stderr_re if terminal else []
+        data = to_bytes(text, errors='surrogate_or_strict')
+        for regex in self._error_patterns:
+            if regex.search(data):
+                return to_text(regex.pattern, errors='surrogate_then_replace')
+
+    def _record(self, result, failed=False):
+        action = result._task.action.split('.')[-1]
+        timings = result._result.get('timings')
+        if isinstance(timings, dict):
+            model = timings.get('model') or 'unknown'
+            for entry in timings.get('connection') or []:
+                if 'command' not in entry:
+                    continue
+                self._dirty = True
+                name = command_name(entry['command'])
+                if entry.get('error'):
+                    self._count_error(entry['error'], model)
+                    continue
+                self._histogram(name, model).observe(entry['wall'])
+                counters = self._bytes.setdefault((name, model), [0, 0])
+                counters[0] += entry.get('bytes_out', 0)
+                counters[1] += entry.get('bytes_in', 0)
+
+        elif failed and action.startswith('huawei_s'):
+            # a failed module returns no timings, count the error it hit
+            pattern = self._match_error(result._result.get('msg', ''))
+            if pattern:
+                self._dirty = True
+                self._count_error(pattern, 'unknown')
+
+    def v2_runner_on_ok(self, result):
+        self._record(result)
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._record(result, failed=True)
+
+    def v2_playbook_on_play_start(self, play):
+        self._write()
+
+    def v2_playbook_on_stats(self, stats):
+        self._write()
+
+    @staticmethod
+    def _label(value):
+        return to_text(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+    def _prometheus(self):
+        lines = [
+            '# HELP huawei_s_command_duration_seconds Wall time of huawei_s CLI commands.',
+            '# TYPE huawei_s_command_duration_seconds histogram',
+        ]
+        for (name, model), hist in sorted(self._histograms.items()):
+            labels = 'command="%s",model="%s"' % (self._label(name), self._label(model))
+            cumulative = 0
+            for bound, count in zip(hist.buckets + [None], hist.counts):
+                cumulative += count
+                le = '+Inf' if bound is None else repr(bound)
+                lines.append('huawei_s_command_duration_seconds_bucket{%s,le="%s"} %d' % (labels, le, cumulative))
+            lines.append('huawei_s_command_duration_seconds_sum{%s} %s' % (labels, repr(round(hist.sum, 6))))
+            lines.append('huawei_s_command_duration_seconds_count{%s} %d' % (labels, hist.count))
+
+        lines.extend([
+            '# HELP huawei_s_command_bytes_total Bytes sent to and received from the device.',
+            '# TYPE huawei_s_command_bytes_total counter',
+        ])
+        for (name, model), (sent, received) in sorted(self._bytes.items()):
+            labels = 'command="%s",model="%s"' % (self._label(name), self._label(model))
+            lines.append('huawei_s_command_bytes_total{%s,direction="out"} %d' % (labels, sent))
+            lines.append('huawei_s_command_bytes_total{%s,direction="in"} %d' % (labels, received))
+
+        lines.extend([
+            '# HELP huawei_s_command_errors_total Commands failed, by terminal error pattern.',
+            '# TYPE huawei_s_command_errors_total counter',
+        ])
+        for (pattern, model), count in sorted(self._errors.items()):
+            lines.append('huawei_s_command_errors_total{pattern="%s",model="%s"} %d'
+                         % (self._label(pattern), self._label(model), count))
+        return '\n'.join(lines) + '\n'
+
+    def _summary(self):
+        commands = list()
+        for (name, model), hist in sorted(self._histograms.items()):
+            commands.append({
+                'command': name,
+                'model': model,
+                'count': hist.count,
+                'sum': round(hist.sum, 6),
+                'p50': hist.quantile(0.5),
+                'p99': hist.quantile(0.99),
+            })
+        errors = [{'pattern': pattern, 'model': model, 'count': count}
+                  for (pattern, model), count in sorted(self._errors.items())]
+        return {'time': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime()), 'commands': commands, 'errors': errors}
+
+    def _write(self):
+        if not self._dirty:
+            return
+        try:
+            write_atomic(os.path.join(self.output_dir, 'huawei_s.prom'), to_bytes(self._prometheus()))
+            write_atomic(os.path.join(self.output_dir, 'huawei_s_metrics.json'),
+                         to_bytes(json.dumps(self._summary(), indent=1, sort_keys=True)))
+        except (IOError, OSError) as exc:
+            self._display.warning('huawei_s_metrics: unable to write metrics: %s' % to_text(exc))
+        self._dirty = False
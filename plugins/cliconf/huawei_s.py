@@ -30,24 +30,268 @@ description:
 version_added: "2.9"
 """
 
+import os
 import re
-import time
 import json
+import socket
+import threading
+import time
 
+from collections import deque
+from functools import wraps
 from itertools import chain
 
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common._collections_compat import Mapping
 from ansible.module_utils.six import iteritems
-from ansible.module_utils.network.common.config import NetworkConfig, dumps
+from ansible.module_utils.six.moves.queue import Queue, Empty
 from ansible.module_utils.network.common.utils import to_list
+from ansible.module_utils.compat.paramiko import PARAMIKO_IMPORT_ERR, paramiko
+from ansible.module_utils.network.huawei_s_series.huawei_s import CHANNELS, MMI_MODE
+from ansible.module_utils.network.huawei_s_series.utils.cache import FactsCache, PlatformCache
+from ansible.module_utils.network.huawei_s_series.utils.config_tree import get_config_diff
+from ansible.module_utils.network.huawei_s_series.utils.profile import Profiler, profile_path
+from ansible.module_utils.network.huawei_s_series.utils.spill import discard_outputs, spill_output, spill_outputs
 from ansible.plugins.cliconf import CliconfBase
 
 
+# how VRP rejects the syntax of a command, a display filter failing with
+# anything else (a timeout, a dropped session) tells nothing about support
+UNSUPPORTED_COMMAND_RE = re.compile(r"Unrecognized command|Wrong parameter|(?:incomplete|ambiguous) command|invalid input", re.I)
+
+# the most command and method timings kept for get_timings()
+MAX_TIMINGS = 1000
+
+
+def timed(func):
+    """ Record the wall time of a Cliconf method for get_timings()
+    """
+    @wraps(func)
+    def wrapped(self, *args, **kwargs):
+        start = time.time()
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._timings.append({'method': func.__name__, 'wall': round(time.time() - start, 6)})
+    return wrapped
+
+
+def command_timing(command, start, resp=None, error=None):
+    """ Return the get_timings() entry of a command sent at start, with
+    the bytes it sent and received or the error it failed on
+    """
+    entry = {
+        'command': to_text(command, errors='surrogate_then_replace')[:80],
+        'wall': round(time.time() - start, 6),
+    }
+    if error is not None:
+        entry['error'] = error
+    else:
+        entry['bytes_out'] = len(to_bytes(command, errors='surrogate_or_strict')) + 1 if command else 0
+        entry['bytes_in'] = len(to_bytes(resp, errors='surrogate_or_strict')) if resp else 0
+    return entry
+
+
+def match_error(terminal, text):
+    """ Return the terminal_stderr_re pattern matching text, if any
+    """
+    data = to_bytes(text, errors='surrogate_or_strict')
+    for regex in terminal.terminal_stderr_re:
+        if regex.search(data):
+            return to_text(regex.pattern, errors='surrogate_then_replace')
+    return 'other'
+
+
+def is_read_only(command):
+    """ Whether command only shows things, VRP takes any abbreviation of
+    display down to `dis`.  is_config_modified() sends `compare
+    configuration` through get()
+    """
+    words = to_text(command, errors='surrogate_then_replace').split()
+    if not words:
+        return True
+    word = words[0].lower()
+    return (len(word) >= 3 and 'display'.startswith(word)) or word in ('compare', 'dir', 'ping', 'tracert')
+
+
+def pushes(func):
+    """ Drop the facts cache of the host after a Cliconf method that may
+    have changed its configuration
+    """
+    @wraps(func)
+    def wrapped(self, *args, **kwargs):
+        try:
+            return func(self, *args, **kwargs)
+        finally:
+            self._clear_facts_cache()
+    return wrapped
+
+
+def profiled(func):
+    """ Run a Cliconf method under the profiler when HUAWEI_S_PROFILE is set
+    """
+    @wraps(func)
+    def wrapped(self, *args, **kwargs):
+        with self._profiler.run():
+            return func(self, *args, **kwargs)
+    return wrapped
+
+
+class SecondaryChannel(object):
+    """ An extra SSH session to the device of the persistent connection
+
+    It logs in to the address of the persistent session with the user,
+    password and key of the play context and the host_key_checking and
+    look_for_keys options of the paramiko connection, and only runs read
+    only commands.  Unlike network_cli it times out with socket timeouts
+    instead of SIGALRM, so it can be used from a worker thread.  The
+    commands it runs are timed into timings, shared with the Cliconf that
+    opened it.
+
+    It does not support a proxy command, become, host_key_auto_add or
+    writing new host keys to known_hosts.
+    """
+
+    def __init__(self, connection, timings):
+        self._connection = connection
+        self._timings = timings
+        self._terminal = connection._terminal
+        self._timeout = connection.get_option('persistent_command_timeout')
+        self._client = None
+        self._chan = None
+        self._prompt = None
+
+    @property
+    def alive(self):
+        return self._chan is not None and not self._chan.closed
+
+    def open(self):
+        if paramiko is None:
+            raise AnsibleConnectionFailure('paramiko is not installed: %s' % to_text(PARAMIKO_IMPORT_ERR))
+        conn = self._connection
+        primary = getattr(conn.paramiko_conn, 'ssh', None)
+        transport = primary.get_transport() if primary is not None else None
+        if transport is None:
+            raise AnsibleConnectionFailure('the persistent session is not connected')
+
+        # the address the persistent session connected to
+        host, port = transport.getpeername()[:2]
+        play_context = conn._play_context
+        self._client = paramiko.SSHClient()
+        if conn.paramiko_conn.get_option('host_key_checking'):
+            self._client.load_system_host_keys()
+            # the persistent session may have accepted a key known_hosts
+            # does not have yet, it is trusted for its address only
+            server_key = transport.get_remote_server_key()
+            self._client.get_host_keys().add(host if port == 22 else '[%s]:%s' % (host, port), server_key.get_name(), server_key)
+        else:
+            self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self._client.connect(
+            host,
+            port=port,
+            username=play_context.remote_user,
+            password=play_context.password,
+            key_filename=os.path.expanduser(play_context.private_key_file) if play_context.private_key_file else None,
+            allow_agent=play_context.password is None,
+            look_for_keys=conn.paramiko_conn.get_option('look_for_keys'),
+            timeout=play_context.timeout,
+        )
+        self._chan = self._client.invoke_shell()
+        self._chan.settimeout(self._timeout)
+        self._receive()
+        self.run('screen-length 0 temporary')
+        return self
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+        self._client = self._chan = None
+
+    def _receive(self):
+        chunks = []
+        window = b''
+        deadline = time.time() + self._timeout
+        while True:
+            try:
+                data = self._chan.recv(4096)
+            except socket.timeout:
+                data = None
+            if not data or time.time() > deadline:
+                self.close()
+                raise AnsibleConnectionFailure('secondary channel closed or timed out')
+            chunks.append(data)
+            # the prompt is at the end, only the last bytes are searched
+            window = (window + data)[-256:]
+            if re.search(self._terminal.terminal_initial_prompt, window):
+                self._chan.sendall(self._terminal.terminal_initial_answer + b'\r')
+                continue
+            for regex in self._terminal.terminal_stdout_re:
+                match = regex.search(window)
+                if match:
+                    self._prompt = match.group()
+                    return b''.join(chunks)
+
+    def run(self, command):
+        """ Send command and return its output, cleaned the way
+        network_cli cleans it
+        """
+        start = time.time()
+        command = to_bytes(command, errors='surrogate_or_strict')
+        try:
+            try:
+                self._chan.sendall(command + b'\r')
+            except (EOFError, OSError, socket.error) as exc:
+                self.close()
+                raise AnsibleConnectionFailure('secondary channel closed: %s' % to_text(exc))
+            resp = self._receive()
+        except AnsibleConnectionFailure:
+            self._timings.append(command_timing(command, start, error='other'))
+            raise
+
+        error = match_error(self._terminal, resp)
+        if error != 'other':
+            self._timings.append(command_timing(command, start, error=error))
+            raise AnsibleConnectionFailure(to_text(resp, errors='surrogate_then_replace'))
+
+        cleaned = []
+        prompts = [prompt.strip() for prompt in self._prompt.strip().splitlines()]
+        for line in resp.splitlines():
+            if line.strip() == command.strip():
+                continue
+            if not any(prompt in line for prompt in prompts):
+                cleaned.append(line)
+        out = to_text(b'\n'.join(cleaned).strip(), errors='surrogate_or_strict')
+        self._timings.append(command_timing(command, start, out))
+        return out
+
+
 class Cliconf(CliconfBase):
 
-    def get_config(self, source='running', flags=None, format=None):
+    def __init__(self, *args, **kwargs):
+        super(Cliconf, self).__init__(*args, **kwargs)
+        # device_info and capabilities are memoized for the life of the
+        # persistent connection, see refresh_capabilities()
+        self._device_info = None
+        self._capabilities = None
+        self._platform_cache = PlatformCache()
+        # session state learned from the prompts seen so far, the view is
+        # 'user', 'system', 'sub' or None when it is not known
+        self._hostname = None
+        self._reset_session_state()
+        # secondary sessions opened by run_commands_parallel()
+        self._channels = []
+        self._timings = deque(maxlen=MAX_TIMINGS)
+        self._profiler = Profiler()
+
+    @timed
+    @profiled
+    def get_config(self, source='running', flags=None, format=None, spill=None):
+        """
+        Fetch the running or saved configuration
+        :param spill: outputs larger than this many bytes are written to a
+                      temp file and only a reference to it is returned
+        """
         if source not in ('running', 'startup'):
             raise ValueError("fetching configuration from %s is not supported" % source)
 
@@ -61,11 +305,29 @@ class Cliconf(CliconfBase):
         else:
             cmd = 'display saved-configuration '
 
-        cmd += ' '.join(to_list(flags))
-        cmd = cmd.strip()
-
-        return self.send_command(cmd)
-
+        # display filters (`| section foo`) a platform is known not to
+        # support are dropped instead of failing on the device first
+        flags = to_list(flags)
+        display_filter = self._get_display_filter(flags)
+        if display_filter:
+            device_info = self.get_device_info()
+            if self._platform_cache.get_filter(device_info, display_filter) is False:
+                flags = flags[:-1]
+                display_filter = None
+
+        try:
+            out = self.send_command((cmd + ' '.join(flags)).strip())
+        except AnsibleConnectionFailure as exc:
+            if not display_filter or not UNSUPPORTED_COMMAND_RE.search(to_text(exc, errors='surrogate_then_replace')):
+                raise
+            self._platform_cache.set_filter(device_info, display_filter, False)
+            return spill_output(self.send_command((cmd + ' '.join(flags[:-1])).strip()), spill)
+
+        if display_filter and self._platform_cache.get_filter(device_info, display_filter) is None:
+            self._platform_cache.set_filter(device_info, display_filter, True)
+        return spill_output(out, spill)
+
+    @profiled
     def get_diff(self, candidate=None, running=None, diff_match='line', diff_ignore_lines=None, path=None, diff_replace='line'):
         """
         Generate diff between candidate and running configuration. If the
@@ -101,7 +363,6 @@ class Cliconf(CliconfBase):
                }
 
         """
-        diff = {}
         device_operations = self.get_device_operations()
         option_values = self.get_option_values()
 
@@ -114,26 +375,11 @@ class Cliconf(CliconfBase):
         if diff_replace not in option_values['diff_replace']:
             raise ValueError("'replace' value %s in invalid, valid values are %s" % (diff_replace, ', '.join(option_values['diff_replace'])))
 
-        # prepare candidate configuration
-        candidate_obj = NetworkConfig(indent=1)
-        want_src, want_banners = self._extract_banners(candidate)
-        candidate_obj.load(want_src)
-
-        if running and diff_match != 'none':
-            # running configuration
-            have_src, have_banners = self._extract_banners(running)
-            running_obj = NetworkConfig(indent=1, contents=have_src, ignore_lines=diff_ignore_lines)
-            configdiffobjs = candidate_obj.difference(running_obj, path=path, match=diff_match, replace=diff_replace)
-
-        else:
-            configdiffobjs = candidate_obj.items
-            have_banners = {}
-
-        diff['config_diff'] = dumps(configdiffobjs, 'commands') if configdiffobjs else ''
-        banners = self._diff_banners(want_banners, have_banners)
-        diff['banner_diff'] = banners if banners else {}
-        return diff
+        return get_config_diff(candidate, running, diff_match=diff_match, diff_ignore_lines=diff_ignore_lines, path=path, diff_replace=diff_replace)
 
+    @timed
+    @pushes
+    @profiled
     def edit_config(self, candidate=None, commit=True, replace=None, comment=None):
         resp = {}
         operations = self.get_device_operations()
@@ -142,7 +388,7 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
-            self.send_command('mmi-mode enable\rscreen-length 0 temporary\rsystem-view')
+            self._prepare_session(view='system', terminal=['mmi-mode enable'])
             for line in to_list(candidate):
                 if not isinstance(line, Mapping):
                     line = {'command': line}
@@ -151,8 +397,10 @@ class Cliconf(CliconfBase):
                 if cmd != 'return' and cmd[0] != '!':
                     results.append(self.send_command(**line))
                     requests.append(cmd)
+                    if cmd.startswith('sysname'):
+                        self._device_info = self._capabilities = None
 
-            self.send_command('return')
+            self._prepare_session(view='user')
         else:
             raise ValueError('check mode is not supported')
 
@@ -160,41 +408,163 @@ class Cliconf(CliconfBase):
         resp['response'] = results
         return resp
 
+    @pushes
+    @profiled
     def edit_macro(self, candidate=None, commit=True, replace=None, comment=None):
         resp = {}
         operations = self.get_device_operations()
-        self.check_edit_config_capabiltiy(operations, candidate, commit, replace, comment)
+        self.check_edit_config_capability(operations, candidate, commit, replace, comment)
 
         results = []
         requests = []
         if commit:
-            commands = ''
-            for line in candidate:
-                if line != 'None':
-                    commands += (' ' + line + '\n')
-                self.send_command('system-view', sendonly=True)
-                obj = {'command': commands, 'sendonly': True}
-                results.append(self.send_command(**obj))
-                requests.append(commands)
-
-            self.send_command('return', sendonly=True)
-            time.sleep(0.1)
-            results.append(self.send_command('\n'))
-            requests.append('\n')
+            # one write per line, as typed, so nothing depends on how the
+            # device reads a long write.  It prints no prompt from `macro
+            # name` on until it reads the line ending the macro, so only
+            # the last line waits for the prompt.
+            lines = [' ' + line for line in candidate if line != 'None']
+            self._prepare_session(view='system')
+            for line in lines[:-1]:
+                results.append(self.send_command(line, sendonly=True))
+                requests.append(line)
+            if lines:
+                results.append(self.send_command(lines[-1]))
+                requests.append(lines[-1])
+            self._prepare_session(view='user')
 
         resp['request'] = requests
         resp['response'] = results
         return resp
 
+    def send_command(self, command=None, prompt=None, answer=None, sendonly=False, newline=True, prompt_retry_check=False, check_all=False):
+        start = time.time()
+        try:
+            resp = super(Cliconf, self).send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline,
+                                                     prompt_retry_check=prompt_retry_check, check_all=check_all)
+        except AnsibleConnectionFailure as exc:
+            self._timings.append(command_timing(command, start, error=match_error(self._connection._terminal, to_text(exc))))
+            raise
+        if sendonly or re.search(r'[\r\n]', to_text(command or '', errors='surrogate_then_replace')):
+            # the prompt was not read, or it may be one the device printed
+            # before it read the last line, so the view is not known anymore
+            self._view = None
+        else:
+            self._update_view(self._connection.get_prompt())
+
+        self._timings.append(command_timing(command, start, resp))
+        return resp
+
+    def get_timings(self, reset=False):
+        """
+        Return the timings recorded since the last reset, oldest first.
+        Commands, on the persistent session or a secondary one, give their
+        wall time in seconds and bytes sent and received, or the
+        terminal_stderr_re pattern they failed on.  Methods give their wall
+        time.  deque appends are atomic, the secondary sessions record
+        from their threads.
+        :param reset: clear the timings once returned
+        """
+        timings = list(self._timings)
+        if reset:
+            self._timings.clear()
+        return timings
+
+    def get_profile(self):
+        """
+        Write the profile of the methods run since the last call to a file
+        named after the host and return its top hot spots, or None when
+        HUAWEI_S_PROFILE is not set
+        """
+        if not self._profiler.enabled:
+            return None
+        host = self.get_host()
+        result = self._profiler.report(profile_path(host, 'cliconf'))
+        result['host'] = host
+        return result
+
+    def _reset_session_state(self):
+        """ Forget the view and terminal settings of the previous shell,
+        called by TerminalModule.on_open_shell() on every (re)connect
+        """
+        self._view = None
+        # on_open_shell() sets the screen length on every new shell
+        self._terminal_settings = set(['screen-length 0 temporary'])
+        if MMI_MODE:
+            self._terminal_settings.add('mmi-mode enable')
+
+    def _update_view(self, prompt):
+        prompt = to_text(prompt, errors='surrogate_then_replace').strip()
+        match = re.search(r'<([^<>]+)>$', prompt)
+        if match:
+            self._view = 'user'
+            self._hostname = match.group(1)
+            return
+
+        self._view = None
+        match = re.search(r'\[~?\*?([^\[\]]+)\]$', prompt)
+        if match and self._hostname:
+            name = match.group(1)
+            if name == self._hostname:
+                self._view = 'system'
+            elif name.startswith(self._hostname + '-'):
+                self._view = 'sub'
+
+    def _prepare_session(self, view=None, terminal=None):
+        """
+        Bring the session to the view and terminal settings wanted, sending
+        only the commands needed for what differs from the tracked state.
+        All of them go in a single write.
+        :param view: 'user' or 'system'
+        :param terminal: list of terminal commands to be set once per session
+        """
+        commands = []
+        missing = [cmd for cmd in to_list(terminal) if cmd not in self._terminal_settings]
+        if missing or view == 'user':
+            # terminal settings are made in the user view
+            if self._view != 'user':
+                commands.append('return')
+            commands.extend(missing)
+            if view == 'system':
+                commands.append('system-view')
+        elif view == 'system' and self._view != 'system':
+            if self._view != 'user':
+                commands.append('return')
+            commands.append('system-view')
+
+        if commands:
+            self.send_command('\r'.join(commands))
+            self._terminal_settings.update(missing)
+
     def get(self, command=None, prompt=None, answer=None, sendonly=False, output=None, newline=True, check_all=False):
         if not command:
             raise ValueError('must provide value of command to execute')
         if output:
             raise ValueError("'output' value %s is not supported for get" % output)
 
-        return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all)
+        try:
+            return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all)
+        finally:
+            if not is_read_only(command):
+                self._clear_facts_cache()
 
+    def get_host(self):
+        """
+        Return the address of the device the connection is to, the key of
+        its facts cache and config store on the controller.  The host
+        option is only the literal inventory_hostname when not set.
+        """
+        return self._connection._play_context.remote_addr
+
+    def _clear_facts_cache(self):
+        host = self.get_host()
+        if host:
+            FactsCache(host).clear()
+
+    @profiled
     def get_device_info(self):
+        if self._device_info is not None:
+            return self._device_info
+
         device_info = {}
 
         device_info['network_os'] = 'huawei_s'
@@ -223,6 +593,7 @@ class Cliconf(CliconfBase):
         if match:
             device_info['network_os_image'] = match.group(1)
 
+        self._device_info = device_info
         return device_info
 
     def get_device_operations(self):
@@ -249,12 +620,40 @@ class Cliconf(CliconfBase):
         }
 
     def get_capabilities(self):
+        if self._capabilities is not None:
+            return self._capabilities
+
         result = super(Cliconf, self).get_capabilities()
-        result['rpc'] += ['edit_banner', 'get_diff', 'run_commands', 'get_defaults_flag']
+        result['rpc'] = result['rpc'] + ['edit_banner', 'get_diff', 'run_commands', 'get_defaults_flag', 'refresh_capabilities',
+                                        'run_commands_parallel', 'get_timings', 'get_profile', 'check_session', 'get_host']
         result['device_operations'] = self.get_device_operations()
         result.update(self.get_option_values())
-        return json.dumps(result)
+        self._capabilities = json.dumps(result)
+        return self._capabilities
+
+    def check_session(self):
+        """
+        Send an empty line and return whether the session is still up.
+        network_cli reads the output of a shell the device closed to its end
+        without an error, so the transport is checked as well.
+        """
+        self.send_command('')
+        shell = self._connection._ssh_shell
+        transport = shell.get_transport() if shell is not None else None
+        return bool(transport and transport.is_active() and not shell.closed)
 
+    def refresh_capabilities(self):
+        """
+        Drop the memoized device_info and capabilities and fetch them again
+        from the device
+        :return: capabilities in json format, as get_capabilities()
+        """
+        self._device_info = None
+        self._capabilities = None
+        return self.get_capabilities()
+
+    @pushes
+    @profiled
     def edit_banner(self, candidate=None, multiline_delimiter="@", commit=True):
         """
         Edit banner on remote device
@@ -272,47 +671,153 @@ class Cliconf(CliconfBase):
         results = []
         requests = []
         if commit:
+            self._prepare_session(view='system')
             for key, value in iteritems(banners_obj):
-                key += ' %s' % multiline_delimiter
-                self.send_command('system-view', sendonly=True)
-                for cmd in [key, value, multiline_delimiter]:
-                    obj = {'command': cmd, 'sendonly': True}
-                    results.append(self.send_command(**obj))
-                    requests.append(cmd)
-
-                self.send_command('end', sendonly=True)
-                time.sleep(0.1)
-                results.append(self.send_command('\n'))
-                requests.append('\n')
+                # the banner and both delimiters go in one write, the
+                # prompt shows up again once the closing delimiter is read
+                cmd = '\n'.join(['%s %s' % (key, multiline_delimiter), value, multiline_delimiter])
+                results.append(self.send_command(cmd))
+                requests.append(cmd)
+            self._prepare_session(view='user')
 
         resp['request'] = requests
         resp['response'] = results
 
         return resp
 
-    def run_commands(self, commands=None, check_rc=True):
+    @timed
+    @profiled
+    def run_commands(self, commands=None, check_rc=True, spill=None):
+        """
+        Run commands one after another on the persistent session.  Any
+        command but a display, dir, ping or tracert drops the facts cache,
+        it may have changed the configuration.
+        :param spill: responses larger than this many bytes are written to
+                      a temp file and only a reference to it is returned
+        """
         if commands is None:
             raise ValueError("'commands' value is required")
 
         responses = list()
-        for cmd in to_list(commands):
-            if not isinstance(cmd, Mapping):
-                cmd = {'command': cmd}
+        changes = False
+        try:
+            for cmd in to_list(commands):
+                if not isinstance(cmd, Mapping):
+                    cmd = {'command': cmd}
+                changes = changes or not is_read_only(cmd.get('command'))
+
+                output = cmd.pop('output', None)
+                if output:
+                    raise ValueError("'output' value %s is not supported for run_commands" % output)
+
+                try:
+                    out = self.send_command(**cmd)
+                except AnsibleConnectionFailure as e:
+                    if check_rc:
+                        raise
+                    out = getattr(e, 'err', to_text(e))
+
+                responses.append(spill_output(out, spill))
+        except Exception:
+            # the caller never gets the references to the files
+            discard_outputs(responses)
+            raise
+        finally:
+            if changes:
+                self._clear_facts_cache()
 
-            output = cmd.pop('output', None)
-            if output:
-                raise ValueError("'output' value %s is not supported for run_commands" % output)
+        return responses
 
+    @timed
+    @profiled
+    def run_commands_parallel(self, commands=None, check_rc=True, channels=None, spill=None):
+        """
+        Run independent read only commands at the same time over the
+        persistent session and up to ``channels`` secondary sessions.
+        The secondary sessions are opened on first use and kept for the
+        life of the persistent connection.  Responses are returned in the
+        order of commands, whichever session ran them.
+        :param commands: read only commands, see is_read_only(), with no
+                         prompt or output options.  When one is not, they
+                         all run in order on the persistent session.
+        :param check_rc: raise on a command error, like run_commands()
+        :param channels: secondary sessions to use, HUAWEI_S_CHANNELS by default
+        :param spill: see run_commands()
+        :return: list of responses
+        """
+        if commands is None:
+            raise ValueError("'commands' value is required")
+
+        commands = to_list(commands)
+        if channels is None:
+            channels = CHANNELS
+        channels = min(channels, len(commands) - 1)
+        read_only = all(not isinstance(cmd, Mapping) and is_read_only(cmd) for cmd in commands)
+        if channels < 1 or not read_only:
+            return self.run_commands(commands, check_rc=check_rc, spill=spill)
+
+        self._open_channels(channels)
+
+        pending = Queue()
+        for index, cmd in enumerate(commands):
+            pending.put((index, cmd))
+
+        responses = [None] * len(commands)
+        errors = dict()
+        retry = list()
+
+        def drain(run, channel=None):
+            while True:
+                try:
+                    index, cmd = pending.get_nowait()
+                except Empty:
+                    return
+                try:
+                    responses[index] = run(cmd)
+                except AnsibleConnectionFailure as exc:
+                    if channel is not None and not channel.alive:
+                        # the session went away, the command is not at fault
+                        retry.append((index, cmd))
+                        return
+                    errors[index] = exc
+
+        threads = []
+        for channel in self._channels[:channels]:
+            thread = threading.Thread(target=drain, args=(channel.run, channel))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        # the persistent session takes its share from the main thread,
+        # network_cli relies on SIGALRM which only works there
+        drain(self.send_command)
+        for thread in threads:
+            thread.join()
+
+        for index, cmd in sorted(retry):
             try:
-                out = self.send_command(**cmd)
-            except AnsibleConnectionFailure as e:
-                if check_rc:
-                    raise
-                out = getattr(e, 'err', to_text(e))
+                responses[index] = self.send_command(cmd)
+            except AnsibleConnectionFailure as exc:
+                errors[index] = exc
 
-            responses.append(out)
+        self._channels = [channel for channel in self._channels if channel.alive]
 
-        return responses
+        for index in sorted(errors):
+            if check_rc:
+                raise errors[index]
+            responses[index] = getattr(errors[index], 'err', to_text(errors[index]))
+
+        return spill_outputs(responses, spill)
+
+    def _open_channels(self, count):
+        self._channels = [channel for channel in self._channels if channel.alive]
+        while len(self._channels) < count:
+            try:
+                self._channels.append(SecondaryChannel(self._connection, self._timings).open())
+            except Exception as exc:
+                # fewer sessions only make it slower, e.g. all VTYs are in use
+                self._connection.queue_message('vvvv', 'unable to open secondary session: %s' % to_text(exc))
+                break
 
     def get_defaults_flag(self):
         """
@@ -320,6 +825,11 @@ class Cliconf(CliconfBase):
         with defaults.
         :return: valid default filter
         """
+        device_info = self.get_device_info()
+        flag = self._platform_cache.get_feature(device_info, 'defaults_flag')
+        if flag:
+            return flag
+
         out = self.get('display current-configuration ?')
         out = to_text(out, errors='surrogate_then_replace')
 
@@ -329,32 +839,15 @@ class Cliconf(CliconfBase):
                 commands.add(line.strip().split()[0])
 
         if 'all' in commands:
-            return 'all'
+            flag = 'all'
         else:
-            return 'full'
-
-    def _extract_banners(self, config):
-        banners = {}
-        banner_cmds = re.findall(r'^header (\w+)', config, re.M)
-        for cmd in banner_cmds:
-            regex = r'header %s information \^C(.+?)(?=\^C)' % cmd
-            match = re.search(regex, config, re.S)
-            if match:
-                key = 'header %s' % cmd
-                banners[key] = match.group(1).strip()
+            flag = 'full'
 
-        for cmd in banner_cmds:
-            regex = r'header %s information \^C(.+?)(?=\^C)' % cmd
-            match = re.search(regex, config, re.S)
-            if match:
-                config = config.replace(str(match.group(1)), '')
-
-        config = re.sub(r'header \w+ \w+ ""#', '!! banner removed', config)
-        return config, banners
+        self._platform_cache.set_feature(device_info, 'defaults_flag', flag)
+        return flag
 
-    def _diff_banners(self, want, have):
-        candidate = {}
-        for key, value in iteritems(want):
-            if value != have.get(key):
-                candidate[key] = value
-        return candidate
+    def _get_display_filter(self, flags):
+        if flags:
+            match = re.match(r'^\|\s*(\w+)', flags[-1].strip())
+            if match:
+                return match.group(1)
@@ -58,3 +58,18 @@ options:
         choices: [ cli ]
         default: cli
 '''
+
+    # The facts_ttl option of the resource modules
+    FACTS_TTL = r'''
+options:
+  facts_ttl:
+    description:
+      - Take the current configuration from the facts cache on the controller
+        when it was gathered, by this module or by M(huawei_s_facts), at most
+        this many seconds ago.
+      - The cache of a host is dropped on every change pushed to it, and on
+        every command other than a display one sent with M(huawei_s_command).
+      - C(0) always gathers it from the device.
+    type: int
+    default: 0
+'''
@@ -24,6 +24,7 @@ import re
 
 from ansible.errors import AnsibleConnectionFailure
 from ansible.module_utils._text import to_text, to_bytes
+from ansible.module_utils.network.huawei_s_series.huawei_s import MMI_MODE
 from ansible.plugins.terminal import TerminalBase
 from ansible.utils.display import Display
 
@@ -69,5 +70,12 @@ class TerminalModule(TerminalBase):
 
         try:
             self._exec_cli_command(b'screen-length 0 temporary')
+            if MMI_MODE:
+                self._exec_cli_command(b'mmi-mode enable')
         except AnsibleConnectionFailure:
             raise AnsibleConnectionFailure('unable to set terminal parameters')
+
+        # a new shell, the cliconf plugin may still track the one before
+        cliconf = getattr(self._connection, 'cliconf', None)
+        if cliconf is not None and hasattr(cliconf, '_reset_session_state'):
+            cliconf._reset_session_state()
@@ -0,0 +1,26 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The outputs of display commands the facts tests parse, from fixtures/
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+
+import pytest
+
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+@pytest.fixture
+def load_fixture():
+    def load(name):
+        with open(os.path.join(FIXTURE_PATH, name)) as f:
+            return f.read()
+    return load
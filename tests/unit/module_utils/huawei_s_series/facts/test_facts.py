@@ -0,0 +1,154 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The resources of a stage are populated on a worker thread, what goes wrong
+there and what they fetch again must come back to the caller.  What is
+gathered is cached per device address.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import threading
+
+import pytest
+
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.network.huawei_s_series.facts.facts import Facts, FACT_RESOURCE_COMMANDS
+from ansible.module_utils.network.huawei_s_series.utils.cache import FactsCache
+
+
+class StandInConnection(object):
+    """ Answers the display commands of the resources with outputs
+    """
+
+    def __init__(self, outputs, fallbacks=None, host=None):
+        self.outputs = outputs
+        self.fallbacks = fallbacks or dict()
+        self.host = host
+        self.threads = list()
+
+    def run_commands_parallel(self, commands, check_rc=True, spill=None):
+        return [self.outputs[command] for command in commands]
+
+    def get(self, command):
+        self.threads.append(threading.current_thread())
+        out = self.fallbacks[command]
+        if isinstance(out, Exception):
+            raise out
+        return out
+
+    def get_host(self):
+        return self.host
+
+
+class StandInModule(object):
+
+    def __init__(self, connection, **params):
+        self.params = {'gather_subset': ['!all'], 'gather_network_resources': None}
+        self.params.update(params)
+        self._socket_path = None
+        self._connection = connection
+        self._huawei_s_connection = connection
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs['msg'])
+
+
+def resource(key, error=None):
+    """ A resource that, like the real ones, fetches empty data again
+    """
+
+    class StandInResource(object):
+
+        def __init__(self, module):
+            pass
+
+        def populate_facts(self, connection, ansible_facts, data=None):
+            if not data:
+                data = connection.get(FACT_RESOURCE_COMMANDS[key])
+            if error:
+                raise error
+            ansible_facts['ansible_network_resources'][key] = data
+            return ansible_facts
+
+    return StandInResource
+
+
+def gather(connection, resources, write_cache=False, **params):
+    facts = Facts(StandInModule(connection, **params), write_cache=write_cache)
+    facts.get_network_resources_facts(resources, sorted(resources))
+    return facts.ansible_facts['ansible_network_resources']
+
+
+def test_empty_output_is_fetched_again_on_the_calling_thread():
+    connection = StandInConnection(
+        {'display lacp brief': 'lacp', 'display lldp local': '', 'display vlan': 'vlans'},
+        {'display lldp local': 'lldp'},
+    )
+    resources = dict((key, resource(key)) for key in ('lacp', 'lldp_global', 'vlans'))
+    assert gather(connection, resources) == {'lacp': 'lacp', 'lldp_global': 'lldp', 'vlans': 'vlans'}
+    assert connection.threads == [threading.current_thread()]
+
+
+def test_fetch_again_error_comes_back():
+    connection = StandInConnection(
+        {'display lacp brief': 'lacp', 'display lldp local': ''},
+        {'display lldp local': ConnectionError('timed out')},
+    )
+    resources = dict((key, resource(key)) for key in ('lacp', 'lldp_global'))
+    with pytest.raises(ConnectionError):
+        gather(connection, resources)
+
+
+def test_worker_error_comes_back():
+    connection = StandInConnection(
+        {'display lacp brief': 'lacp', 'display lldp local': 'lldp', 'display vlan': 'vlans'},
+    )
+    resources = dict((key, resource(key)) for key in ('lldp_global', 'vlans'))
+    resources['lacp'] = resource('lacp', error=ValueError('unexpected output'))
+    with pytest.raises(ValueError):
+        gather(connection, resources)
+
+
+def test_worker_error_comes_back_before_fetch_again():
+    connection = StandInConnection(
+        {'display lacp brief': 'lacp', 'display lldp local': ''},
+        {'display lldp local': 'lldp'},
+    )
+    resources = {'lacp': resource('lacp', error=ValueError('unexpected output')), 'lldp_global': resource('lldp_global')}
+    with pytest.raises(ValueError):
+        gather(connection, resources)
+    # the resource after the failed one is not populated
+    assert connection.threads == []
+
+
+def test_each_host_has_its_own_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv('HUAWEI_S_FACTS_CACHE', str(tmp_path))
+    resources = {'vlans': resource('vlans')}
+    for host in ('10.0.0.1', '10.0.0.2'):
+        connection = StandInConnection({'display vlan': 'vlans of %s' % host}, host=host)
+        gather(connection, resources, facts_ttl=60)
+
+    assert sorted(os.listdir(str(tmp_path))) == ['10.0.0.1.json', '10.0.0.2.json']
+    for host in ('10.0.0.1', '10.0.0.2'):
+        assert FactsCache(host).get('vlans')['facts'] == 'vlans of %s' % host
+
+    # served from the cache of the host, not fetched
+    connection = StandInConnection({}, host='10.0.0.2')
+    assert gather(connection, resources, facts_ttl=60) == {'vlans': 'vlans of 10.0.0.2'}
+
+
+def test_cache_is_written_when_asked(tmp_path, monkeypatch):
+    monkeypatch.setenv('HUAWEI_S_FACTS_CACHE', str(tmp_path))
+    resources = {'vlans': resource('vlans')}
+    connection = StandInConnection({'display vlan': 'vlans'}, host='10.0.0.1')
+    gather(connection, resources)
+    assert os.listdir(str(tmp_path)) == []
+
+    gather(connection, resources, write_cache=True)
+    assert FactsCache('10.0.0.1').get('vlans')['facts'] == 'vlans'
@@ -0,0 +1,128 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The legacy subsets of huawei_s_facts on the outputs of real switches, a
+single one and a stack of two
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.network.huawei_s_series.facts.legacy.base import Hardware, Interfaces
+
+
+class StandInConnection(object):
+    """ Answers the commands with the outputs of fixtures
+    """
+
+    def __init__(self, load_fixture, fixtures):
+        self.load_fixture = load_fixture
+        self.fixtures = fixtures
+        self.commands = list()
+
+    def run_commands_parallel(self, commands, check_rc=True, spill=None):
+        self.commands.extend(commands)
+        return [self.load_fixture(self.fixtures[command]) for command in commands]
+
+
+class StandInModule(object):
+
+    def __init__(self, connection):
+        self.params = dict()
+        self._socket_path = None
+        self._huawei_s_connection = connection
+
+
+SWITCH = {
+    'dir': 'dir',
+    'display memory-usage': 'display_memory_usage',
+    'display stack': 'display_stack',
+}
+
+STACK = {
+    'dir': 'dir',
+    'display memory-usage': 'display_memory_usage',
+    'display stack': 'display_stack_two_members',
+    'dir slot1#flash:': 'dir_slot1_flash',
+    'display memory-usage slot 1': 'display_memory_usage_slot_1',
+}
+
+
+def hardware(load_fixture, fixtures):
+    connection = StandInConnection(load_fixture, fixtures)
+    subset = Hardware(StandInModule(connection))
+    subset.populate()
+    return subset, connection
+
+
+def test_neighbors_brief(load_fixture):
+    facts = Interfaces(None).parse_neighbors_brief(load_fixture('display_lldp_neighbor_brief'))
+    assert facts == {
+        'GigabitEthernet0/0/1': [{'host': 'SW2', 'port': 'GigabitEthernet0/0/24'}],
+        # an IP phone sends no system name and its MAC address as port
+        'GigabitEthernet0/0/5': [{'host': None, 'port': '0019-e8a1-2b3c'}],
+        'XGigabitEthernet0/0/1': [{'host': 'Core Switch Building A', 'port': 'XGigabitEthernet1/0/12'}],
+        # the port names longer than their column push the next one along
+        'XGigabitEthernet0/0/2': [{'host': 'AGG-SW-01', 'port': 'XGigabitEthernet1/0/12'}],
+        'GigabitEthernet0/0/9': [{'host': 'SW3', 'port': 'FortyGigabitEthernet1/0/49'}],
+    }
+
+
+def test_neighbors_brief_columns_in_another_order(load_fixture):
+    facts = Interfaces(None).parse_neighbors_brief(load_fixture('display_lldp_neighbor_brief_exptime_first'))
+    assert facts == {
+        'GigabitEthernet0/0/1': [{'host': 'Access SW 2', 'port': 'GigabitEthernet0/0/24'}],
+        'GigabitEthernet0/0/7': [{'host': None, 'port': '0019-e8a1-2b3c'}],
+    }
+
+
+def test_neighbors_brief_without_table():
+    assert Interfaces(None).parse_neighbors_brief('Error: Unrecognized command found at \'^\' position.') is None
+    assert Interfaces(None).parse_neighbors_brief('') is None
+
+
+def test_hardware_of_a_switch(load_fixture):
+    subset, connection = hardware(load_fixture, SWITCH)
+    assert connection.commands == ['dir', 'display memory-usage', 'display stack']
+    # the facts a switch had before stacks were told apart
+    assert subset.facts == {
+        'filesystems': ['flash:'],
+        'filesystems_info': {'flash:': {'spacetotal_kb': 509256, 'spacefree_kb': 382804}},
+        'memtotal_mb': 365142016 / 1048576,
+        'memfree_mb': (365142016 - 180592020) / 1048576,
+    }
+    assert subset.warnings == []
+
+
+def test_hardware_of_a_stack(load_fixture):
+    subset, connection = hardware(load_fixture, STACK)
+    assert connection.commands[3:] == ['dir slot1#flash:', 'display memory-usage slot 1']
+    master = {'memtotal_mb': 365142016 / 1048576, 'memfree_mb': (365142016 - 180592020) / 1048576}
+    assert subset.facts == dict(master, **{
+        'filesystems': ['flash:', 'slot1#flash:'],
+        'filesystems_info': {
+            'flash:': {'spacetotal_kb': 509256, 'spacefree_kb': 382804},
+            'slot1#flash:': {'spacetotal_kb': 509256, 'spacefree_kb': 390112},
+        },
+        'stacked_memory': {
+            '0': master,
+            '1': {'memtotal_mb': 365142016 / 1048576, 'memfree_mb': (365142016 - 162529280) / 1048576},
+        },
+    })
+
+
+def test_hardware_of_a_stack_member_without_memory(load_fixture):
+    # a member that answers with something else than the memory usage
+    subset, connection = hardware(load_fixture, dict(STACK, **{'display memory-usage slot 1': 'display_stack'}))
+    assert sorted(subset.facts['stacked_memory']) == ['0']
+    assert subset.warnings == ['Unable to gather memory statistics of slot 1']
+
+
+def test_memory_not_parsed():
+    subset = Hardware(None)
+    assert subset.parse_memory("Error: Unrecognized command found at '^' position.") is None
+    # both numbers are needed
+    assert subset.parse_memory('  System Total Memory Is: 365142016 bytes') is None
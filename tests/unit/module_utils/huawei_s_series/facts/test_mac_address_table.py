@@ -0,0 +1,86 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The MAC address table parsed from display mac-address, and the commands
+the vlans and interfaces options filter it with
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible.module_utils.network.huawei_s_series.facts.mac_address_table.mac_address_table import (
+    MAC_TYPES,
+    MacTable,
+    Mac_address_tableFacts,
+    expand_mac_table,
+)
+
+
+def parse(*outputs):
+    table = MacTable()
+    for out in outputs:
+        table.parse(out)
+    return table.to_dict()
+
+
+def test_parse(load_fixture):
+    table = parse(load_fixture('display_mac_address'))
+    assert table['count'] == 4
+    assert table['interfaces'] == ['GigabitEthernet0/0/1', 'Eth-Trunk1', 'GigabitEthernet0/0/2']
+    assert table['types'] == list(MAC_TYPES)
+    assert expand_mac_table(table) == [
+        {'mac': '0025-9e95-7c31', 'vlan': 10, 'interface': 'GigabitEthernet0/0/1', 'type': 'dynamic'},
+        {'mac': '5489-98f1-2a6b', 'vlan': 20, 'interface': 'Eth-Trunk1', 'type': 'dynamic'},
+        {'mac': '000f-e201-0001', 'vlan': 10, 'interface': 'GigabitEthernet0/0/2', 'type': 'static'},
+        {'mac': '0025-9e95-7c32', 'vlan': 10, 'interface': 'GigabitEthernet0/0/1', 'type': 'sticky'},
+    ]
+
+
+def test_parse_pevlan_columns(load_fixture):
+    table = parse(load_fixture('display_mac_address_pevlan'))
+    assert expand_mac_table(table) == [
+        {'mac': '0025-9e95-7c31', 'vlan': 10, 'interface': 'GigabitEthernet0/0/1', 'type': 'dynamic'},
+        {'mac': '5489-98f1-2a6b', 'vlan': 20, 'interface': 'Eth-Trunk1', 'type': 'dynamic'},
+    ]
+
+
+def test_parse_empty_table(load_fixture):
+    table = parse(load_fixture('display_mac_address_empty'))
+    assert table['count'] == 0
+    assert table['macs'] == []
+    assert table['interfaces'] == []
+    assert expand_mac_table(table) == []
+
+
+def test_parse_several_outputs_into_one_table(load_fixture):
+    # one output per command of get_commands()
+    table = parse(load_fixture('display_mac_address_empty'), load_fixture('display_mac_address_pevlan'),
+                  load_fixture('display_mac_address'))
+    assert table['count'] == 6
+    assert table['interfaces'] == ['GigabitEthernet0/0/1', 'Eth-Trunk1', 'GigabitEthernet0/0/2']
+
+
+class StandInModule(object):
+
+    def __init__(self, **params):
+        self.params = params
+
+
+@pytest.mark.parametrize('params, commands', [
+    ({}, ['display mac-address']),
+    ({'vlans': [10, 20]}, ['display mac-address vlan 10', 'display mac-address vlan 20']),
+    ({'interfaces': ['GE0/0/1', 'Eth-Trunk1']},
+     ['display mac-address GigabitEthernet0/0/1', 'display mac-address Eth-Trunk1']),
+    ({'vlans': [10, 20], 'interfaces': ['GE0/0/1']},
+     ['display mac-address GigabitEthernet0/0/1 vlan 10', 'display mac-address GigabitEthernet0/0/1 vlan 20']),
+    # the same interface named twice is asked once
+    ({'vlans': [10], 'interfaces': ['GE0/0/1', 'GigabitEthernet0/0/1']},
+     ['display mac-address GigabitEthernet0/0/1 vlan 10']),
+])
+def test_get_commands(params, commands):
+    assert Mac_address_tableFacts(StandInModule(**params)).get_commands() == commands
@@ -0,0 +1,165 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+ConfigTree must diff like the NetworkConfig it replaces, and the combined
+diff_ignore_lines matcher must match like the patterns on their own
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+import pytest
+
+from ansible.module_utils.network.common.config import NetworkConfig, Pattern, dumps
+from ansible.module_utils.network.huawei_s_series.utils import config_tree
+from ansible.module_utils.network.huawei_s_series.utils.config_tree import ConfigTree, IgnoreLines, get_ignore_matcher
+
+
+RUNNING = """
+sysname SW1
+#
+vlan batch 10 20
+#
+interface Vlanif10
+ ip address 10.0.10.1 255.255.255.0
+#
+interface GigabitEthernet0/0/1
+ port link-type access
+ port default vlan 10
+#
+interface GigabitEthernet0/0/2
+ port link-type trunk
+ port trunk allow-pass vlan 10 20
+#
+ospf 1
+ area 0.0.0.0
+  network 10.0.10.0 0.0.0.255
+#
+return
+"""
+
+CANDIDATES = [
+    # a line added to an existing section
+    """
+interface GigabitEthernet0/0/1
+ port link-type access
+ port default vlan 10
+ description uplink
+""",
+    # the same lines in another order
+    """
+interface GigabitEthernet0/0/2
+ port trunk allow-pass vlan 10 20
+ port link-type trunk
+""",
+    # a new section and a nested line
+    """
+interface GigabitEthernet0/0/3
+ port link-type access
+ospf 1
+ area 0.0.0.0
+  network 10.0.20.0 0.0.0.255
+""",
+    # nothing to change
+    """
+sysname SW1
+vlan batch 10 20
+""",
+]
+
+
+def diff(cls, candidate, **kwargs):
+    want = cls(indent=1, contents=candidate)
+    have = cls(indent=1, contents=RUNNING)
+    return dumps(want.difference(have, **kwargs), 'commands')
+
+
+@pytest.mark.parametrize('candidate', CANDIDATES)
+@pytest.mark.parametrize('match', ['line', 'strict', 'exact'])
+@pytest.mark.parametrize('replace', ['line', 'block'])
+def test_diff_matches_network_config(candidate, match, replace):
+    assert diff(ConfigTree, candidate, match=match, replace=replace) == \
+        diff(NetworkConfig, candidate, match=match, replace=replace)
+
+
+@pytest.mark.parametrize('match', ['strict', 'exact'])
+def test_diff_matches_network_config_in_path(match):
+    candidate = CANDIDATES[0]
+    path = ['interface GigabitEthernet0/0/1']
+    assert diff(ConfigTree, candidate, match=match, path=path) == \
+        diff(NetworkConfig, candidate, match=match, path=path)
+
+
+def test_invalid_match_raises_like_network_config():
+    with pytest.raises(Exception) as expected:
+        diff(NetworkConfig, CANDIDATES[0], match='bogus')
+    with pytest.raises(Exception) as raised:
+        diff(ConfigTree, CANDIDATES[0], match='bogus')
+    assert type(raised.value) is type(expected.value)
+
+
+IGNORE_PATTERNS = [
+    r'sysname',
+    r'ntp-service|snmp-agent',
+    r'^info-center',
+    r'.*\d+\.\d+\.\d+\.\d+$',
+    r'user-interface (?:con|vty) 0',
+    r'(\w+) \1',
+    re.compile(r'HEADER', re.I),
+]
+
+IGNORE_LINES = [
+    'sysname SW1',
+    'ntp-service unicast-server 10.0.0.1',
+    'snmp-agent community read public',
+    'info-center source default channel 2',
+    ' info-center enable',
+    'ip route-static 0.0.0.0 0.0.0.0 10.0.0.254',
+    'ip route-static 0.0.0.0 0.0.0.0 10.0.0.254 preference 10',
+    'user-interface con 0',
+    'user-interface vty 0 4',
+    'user-interface maint 0',
+    'undo undo',
+    'undo shutdown',
+    'header login information "hi"',
+    'interface GigabitEthernet0/0/1',
+    '',
+]
+
+
+def test_ignore_matcher_matches_like_each_pattern():
+    matcher = IgnoreLines(IGNORE_PATTERNS)
+    regexes = [item if isinstance(item, Pattern) else re.compile(item) for item in IGNORE_PATTERNS]
+    for line in IGNORE_LINES:
+        assert matcher.match(line) == any(regex.match(line) for regex in regexes), line
+
+
+def test_ignore_matcher_falls_back_when_patterns_do_not_combine():
+    # a pattern with a group of the same name twice only fails combined
+    patterns = [r'(?P<word>\w+) foo', r'(?P<word>\w+) bar']
+    matcher = IgnoreLines(patterns)
+    for line in ['a foo', 'b bar', 'c baz']:
+        assert matcher.match(line) == any(re.match(item, line) for item in patterns)
+
+
+def test_ignore_matchers_are_cached_by_patterns():
+    config_tree._IGNORE_MATCHERS.clear()
+    assert get_ignore_matcher(None) is None
+    assert get_ignore_matcher([]) is None
+    first = get_ignore_matcher(['sysname', 'ntp-service'])
+    assert get_ignore_matcher(['sysname', 'ntp-service']) is first
+    assert get_ignore_matcher(['ntp-service', 'sysname']) is not first
+    assert get_ignore_matcher(first) is first
+    assert len(config_tree._IGNORE_MATCHERS) == 2
+
+
+def test_ignore_lines_are_left_out_of_the_tree():
+    tree = ConfigTree(indent=1, contents=RUNNING, ignore_lines=['sysname', r'network 10\.'])
+    assert tree.get_object(['sysname SW1']) is None
+    assert tree.get_object(['ospf 1', 'area 0.0.0.0']) is not None
+    assert tree.get_object(['ospf 1', 'area 0.0.0.0', 'network 10.0.10.0 0.0.0.255']) is None
@@ -0,0 +1,70 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The config store keeps line deltas and must give every text back as stored
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+
+from ansible.module_utils.network.huawei_s_series.utils import store as store_module
+from ansible.module_utils.network.huawei_s_series.utils.store import ConfigStore, config_digest
+
+
+def revision(number):
+    """ A configuration that changes a little from one revision to the next
+    """
+    lines = ['sysname SW1', '#', 'vlan batch 10 20']
+    for index in range(1, 25):
+        lines.extend(['#', 'interface GigabitEthernet0/0/%d' % index, ' port link-type access'])
+        if index <= number:
+            lines.append(' description revision %d' % number)
+        lines.append(' port default vlan %d' % (10 + index % 2 * 10))
+    lines.extend(['#', 'return'])
+    return '\n'.join(lines)
+
+
+def test_revisions_round_trip(tmp_path):
+    store = ConfigStore(str(tmp_path))
+    digests = list()
+    for number in range(20):
+        digest, written = store.put('sw1', revision(number))
+        assert written
+        assert digest == config_digest(revision(number))
+        assert store.head('sw1') == digest
+        digests.append(digest)
+
+    for number, digest in enumerate(digests):
+        assert store.get(digest) == revision(number)
+
+    depths = [store._load_object(digest)['depth'] for digest in digests]
+    assert max(depths) == store_module.MAX_DELTA_CHAIN - 1
+    # the chain starts over with a full copy once it is too long
+    assert depths[store_module.MAX_DELTA_CHAIN] == 0
+    assert store._load_object(digests[store_module.MAX_DELTA_CHAIN])['base'] is None
+    assert store._load_object(digests[1])['base'] == digests[0]
+
+    assert [entry['digest'] for entry in store.history('sw1')] == digests
+
+
+def test_same_text_is_not_written_again(tmp_path):
+    store = ConfigStore(str(tmp_path))
+    digest, written = store.put('sw1', revision(1))
+    assert written
+    assert store.put('sw1', revision(1)) == (digest, False)
+    assert store.put('sw2', revision(1)) == (digest, False)
+    assert len(store.history('sw1')) == 2
+
+
+def test_host_names_stay_in_the_store(tmp_path):
+    store = ConfigStore(str(tmp_path))
+    digest, written = store.put('../sw1', revision(1))
+    assert store.head('../sw1') == digest
+    assert os.path.exists(os.path.join(str(tmp_path), 'refs', '.._sw1'))
+    assert os.path.exists(os.path.join(str(tmp_path), 'manifest', '.._sw1.jsonl'))
+    assert not os.path.exists(os.path.join(str(tmp_path), 'sw1'))
@@ -0,0 +1,119 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The session daemon mode of the huawei_s action plugin against the local
+SSH stand-in for a switch of conftest.py, the sessions are real
+ansible-connection processes running network_cli.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import time
+
+from ansible.module_utils.connection import Connection
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.action.network import ActionModule as ActionNetworkModule
+from ansible.plugins.loader import connection_loader
+
+import ansible.plugins.action.huawei_s as huawei_s_action
+
+
+def wait_gone(path, timeout=10):
+    deadline = time.time() + timeout
+    while os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.1)
+    return not os.path.exists(path)
+
+
+def test_later_run_attaches_to_warm_session(switch, control_path, open_session):
+    first_run = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    pc = switch.play_context()
+    socket_path, reused = open_session(first_run, pc)
+    assert not reused
+    assert 'S5720' in Connection(socket_path).send_command('display version')
+    assert switch.logins == 1
+
+    # a later ansible-playbook run with its own pool
+    later_run = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    start = time.time()
+    attached = later_run.attach(switch.play_context(), {'ansible_command_timeout': 10})
+    assert attached == socket_path
+    assert time.time() - start < 1
+    assert switch.logins == 1
+
+
+def test_play_cleanup_keeps_daemon_session(switch, control_path, monkeypatch):
+    monkeypatch.setattr(huawei_s_action, 'SESSION_DAEMON', True)
+
+    def run_module(self, tmp=None, task_vars=None):
+        # what _execute_module() does to the task args
+        self._task.args['_ansible_socket'] = task_vars['ansible_socket']
+        return {}
+    monkeypatch.setattr(ActionNetworkModule, 'run', run_module)
+
+    class Task(object):
+        action = 'huawei_s_command'
+        args = {'commands': ['display version'],
+                'provider': {'host': '127.0.0.1', 'port': switch.port, 'username': 'admin',
+                             'password': switch.password, 'timeout': 10}}
+
+    class SharedLoader(object):
+        pass
+    shared_loader = SharedLoader()
+    shared_loader.connection_loader = connection_loader
+
+    pc = PlayContext()
+    pc.connection = 'local'
+    action = huawei_s_action.ActionModule(Task(), None, pc, None, None, shared_loader)
+    task_vars = {}
+    action.run(task_vars=task_vars)
+    socket_path = task_vars['ansible_socket']
+    assert '_ansible_socket' not in Task.args
+
+    # StrategyBase.cleanup() resets the sockets of the task args
+    for sock in [Task.args.get('_ansible_socket')]:
+        if sock:
+            Connection(sock).reset()
+
+    assert os.path.exists(socket_path)
+    assert Connection(socket_path).send_command('display version')
+    assert switch.logins == 1
+
+
+def test_dead_session_is_replaced(switch, control_path, open_session):
+    pool = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    pc = switch.play_context()
+    socket_path, reused = open_session(pool, pc)
+    # network_cli logs in on the first command
+    assert Connection(socket_path).send_command('display version')
+    switch.drop_sessions()
+
+    # the health check finds the session dead and closes it
+    assert pool.attach(pc, {'ansible_command_timeout': 10}) is None
+    socket_path, reused = open_session(pool, pc)
+    assert not reused
+    assert Connection(socket_path).send_command('display version')
+    assert switch.logins == 2
+
+
+def test_idle_session_exits(switch, control_path, monkeypatch, open_session):
+    monkeypatch.setattr(huawei_s_action, 'SESSION_IDLE_TIMEOUT', 2)
+    pool = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    socket_path, reused = open_session(pool, switch.play_context())
+    assert os.path.exists(socket_path)
+    assert wait_gone(socket_path)
+
+
+def test_sessions_per_host_are_capped(switch, control_path, monkeypatch, open_session):
+    monkeypatch.setattr(huawei_s_action, 'SESSION_MAX_PER_HOST', 1)
+    pool = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    first, reused = open_session(pool, switch.play_context(user='first'))
+    second, reused = open_session(pool, switch.play_context(user='second'))
+    assert first != second
+    assert wait_gone(first)
+    assert os.path.exists(second)
@@ -0,0 +1,110 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The huawei_s_metrics callback histograms and the files it writes
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import os
+
+import pytest
+
+from ansible.plugins.loader import callback_loader
+
+from ansible.plugins.callback.huawei_s_metrics import Histogram
+
+
+class Task(object):
+    action = 'huawei_s_command'
+
+
+class Result(object):
+
+    def __init__(self, result):
+        self._task = Task()
+        self._result = result
+
+
+def histogram(values, buckets=(0.1, 0.5, 1.0)):
+    hist = Histogram(list(buckets))
+    for value in values:
+        hist.observe(value)
+    return hist
+
+
+def test_quantile_of_empty_histogram():
+    assert histogram([]).quantile(0.5) is None
+
+
+def test_quantile_interpolates_within_the_bucket():
+    # four observations in (0.1, 0.5], the median is half way
+    hist = histogram([0.05, 0.2, 0.3, 0.4, 0.45, 0.9])
+    assert hist.counts == [1, 4, 1, 0]
+    assert hist.quantile(0.5) == pytest.approx(0.1 + 0.4 * 2 / 4)
+    assert hist.quantile(1.0 / 6) == pytest.approx(0.1)
+    assert hist.quantile(1.0) == pytest.approx(1.0)
+
+
+def test_quantile_above_the_last_bucket_is_its_bound():
+    hist = histogram([0.05, 5, 7])
+    assert hist.counts == [1, 0, 0, 2]
+    assert hist.quantile(0.99) == 1.0
+    assert hist.count == 3
+    assert hist.sum == pytest.approx(12.05)
+
+
+@pytest.fixture
+def callback(tmp_path, monkeypatch):
+    # set first so that the value the callback sets is undone as well
+    monkeypatch.setenv('HUAWEI_S_TIMINGS', '0')
+    monkeypatch.delenv('HUAWEI_S_TIMINGS')
+    plugin = callback_loader.get('huawei_s_metrics')
+    assert 'HUAWEI_S_TIMINGS' not in os.environ
+    plugin.set_options(direct={'output_dir': str(tmp_path), 'buckets': [0.1, 0.5, 1]})
+    return plugin
+
+
+def test_options_turn_on_module_timings(callback):
+    assert os.environ['HUAWEI_S_TIMINGS'] == '1'
+
+
+def test_textfile_output(callback, tmp_path):
+    timings = {
+        'model': 'S5720-28X-LI-AC',
+        'connection': [
+            {'command': 'display interface brief GE0/0/1', 'wall': 0.2, 'bytes_out': 33, 'bytes_in': 400},
+            {'command': 'display interface brief GE0/0/2', 'wall': 0.7, 'bytes_out': 33, 'bytes_in': 380},
+            {'command': 'display vlan 4095', 'wall': 0.05, 'error': 'Error:'},
+            {'method': 'run_commands', 'wall': 1.0},
+        ],
+    }
+    callback.v2_runner_on_ok(Result({'timings': timings}))
+    callback.v2_playbook_on_stats(None)
+
+    with open(str(tmp_path / 'huawei_s.prom')) as f:
+        lines = f.read().splitlines()
+    labels = 'command="display interface",model="S5720-28X-LI-AC"'
+    for line in [
+        'huawei_s_command_duration_seconds_bucket{%s,le="0.1"} 0' % labels,
+        'huawei_s_command_duration_seconds_bucket{%s,le="0.5"} 1' % labels,
+        'huawei_s_command_duration_seconds_bucket{%s,le="1.0"} 2' % labels,
+        'huawei_s_command_duration_seconds_bucket{%s,le="+Inf"} 2' % labels,
+        'huawei_s_command_duration_seconds_count{%s} 2' % labels,
+        'huawei_s_command_bytes_total{%s,direction="out"} 66' % labels,
+        'huawei_s_command_bytes_total{%s,direction="in"} 780' % labels,
+        'huawei_s_command_errors_total{pattern="Error:",model="S5720-28X-LI-AC"} 1',
+    ]:
+        assert line in lines
+    assert not [line for line in lines if 'run_commands' in line or 'display vlan' in line]
+
+    with open(str(tmp_path / 'huawei_s_metrics.json')) as f:
+        summary = json.load(f)
+    assert summary['commands'] == [{'command': 'display interface', 'model': 'S5720-28X-LI-AC',
+                                    'count': 2, 'sum': 0.9, 'p50': 0.5, 'p99': 0.99}]
+    assert summary['errors'] == [{'pattern': 'Error:', 'model': 'S5720-28X-LI-AC', 'count': 1}]
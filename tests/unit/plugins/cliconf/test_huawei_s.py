@@ -0,0 +1,72 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Which commands leave the facts cache alone, and whose cache the others drop
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+
+import pytest
+
+from ansible.module_utils.network.huawei_s_series.utils.cache import FactsCache
+from ansible.plugins.cliconf.huawei_s import Cliconf, is_read_only
+
+
+class StandInPlayContext(object):
+
+    def __init__(self, remote_addr):
+        self.remote_addr = remote_addr
+
+
+class StandInConnection(object):
+
+    def __init__(self, remote_addr):
+        self._play_context = StandInPlayContext(remote_addr)
+
+    def get_option(self, option):
+        # only the literal inventory_hostname when not set
+        return 'inventory_hostname'
+
+
+@pytest.mark.parametrize('command', [
+    'display current-configuration',
+    'dis version',
+    'DIS interface brief',
+    'compare configuration',
+    'dir flash:',
+    'ping 10.0.0.1',
+    '',
+    '   ',
+])
+def test_read_only(command):
+    assert is_read_only(command)
+
+
+@pytest.mark.parametrize('command', [
+    'save',
+    'di version',
+    'system-view',
+    'undo shutdown',
+    'reset saved-configuration',
+])
+def test_not_read_only(command):
+    assert not is_read_only(command)
+
+
+def test_facts_cache_is_dropped_for_its_host_only(tmp_path, monkeypatch):
+    monkeypatch.setenv('HUAWEI_S_FACTS_CACHE', str(tmp_path))
+    hosts = ('10.0.0.1', '10.0.0.2')
+    for host in hosts:
+        FactsCache(host).set_facts({'vlans': []})
+
+    cliconfs = [Cliconf(StandInConnection(host)) for host in hosts]
+    assert [cliconf.get_host() for cliconf in cliconfs] == list(hosts)
+
+    cliconfs[0]._clear_facts_cache()
+    assert os.listdir(str(tmp_path)) == ['10.0.0.2.json']
@@ -0,0 +1,52 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+run_commands_parallel() over secondary sessions to the local SSH stand-in
+for a switch of conftest.py
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.connection import Connection
+from ansible.plugins.loader import connection_loader
+
+import ansible.plugins.action.huawei_s as huawei_s_action
+
+
+def connect(switch, open_session):
+    pool = huawei_s_action.ConnectionPool(connection_loader, daemon=True)
+    socket_path, reused = open_session(pool, switch.play_context())
+    connection = Connection(socket_path)
+    # network_cli logs in on the first command
+    connection.send_command('display version')
+    connection.get_timings(reset=True)
+    return connection
+
+
+def test_read_only_commands_use_secondary_sessions(switch, control_path, open_session):
+    connection = connect(switch, open_session)
+    commands = ['display version', 'dis version', 'dir', 'display version']
+    responses = connection.run_commands_parallel(commands, channels=2)
+    assert switch.logins == 3
+    assert ['S5720' in out for out in responses] == [True, True, False, True]
+
+    # the commands of every session are timed
+    timings = connection.get_timings()
+    timed = [entry['command'] for entry in timings if 'command' in entry]
+    assert sorted(timed) == sorted(commands + ['screen-length 0 temporary'] * 2)
+
+    # the sessions are kept for the next call
+    connection.run_commands_parallel(commands, channels=2)
+    assert switch.logins == 3
+
+
+def test_other_commands_run_on_the_persistent_session(switch, control_path, open_session):
+    connection = connect(switch, open_session)
+    for commands in (['display version', 'dirty'], ['display version', 'system-view'], ['display version', 'save']):
+        responses = connection.run_commands_parallel(commands, channels=2)
+        assert 'S5720' in responses[0]
+    assert switch.logins == 1
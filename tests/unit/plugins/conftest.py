@@ -0,0 +1,199 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2019 Red Hat
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A local SSH stand-in for a switch, for the plugin tests that run real
+ansible-connection sessions.  The stand-in is a paramiko server that
+answers with a VRP prompt and counts the logins.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import os
+import socket
+import threading
+
+import pytest
+
+try:
+    import paramiko
+    ServerInterface = paramiko.ServerInterface
+except ImportError:
+    paramiko = None
+    ServerInterface = object
+
+from ansible import constants as C
+from ansible.module_utils.connection import Connection
+from ansible.playbook.play_context import PlayContext
+
+import ansible.plugins.action.huawei_s as huawei_s_action
+
+
+PASSWORD = 'huawei123'
+
+OUTPUTS = {
+    b'screen-length 0 temporary': b'Info: The configuration takes effect on the current user terminal interface only.',
+    b'display version': b'Huawei Versatile Routing Platform Software\r\n'
+                        b'VRP (R) software, Version 5.170 (S5720 V200R010C00SPC600)\r\n'
+                        b'HUAWEI S5720-28X-LI-AC Routing Switch uptime is 0 week, 0 day, 1 hour, 2 minutes',
+}
+OUTPUTS[b'dis version'] = OUTPUTS[b'display version']
+
+
+class StandInServer(ServerInterface):
+
+    def __init__(self, device):
+        self.device = device
+        self.shell = threading.Event()
+
+    def check_auth_password(self, username, password):
+        if password != PASSWORD:
+            return paramiko.AUTH_FAILED
+        with self.device.lock:
+            self.device.logins += 1
+        return paramiko.AUTH_SUCCESSFUL
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        self.shell.set()
+        return True
+
+
+class StandInSwitch(object):
+    """ Accepts SSH logins on localhost and runs a VRP like shell on them
+    """
+
+    prompt = b'<SW1>'
+    password = PASSWORD
+
+    def __init__(self):
+        self.host_key = paramiko.RSAKey.generate(2048)
+        self.logins = 0
+        self.lock = threading.Lock()
+        self._transports = []
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        thread = threading.Thread(target=self._accept)
+        thread.daemon = True
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                client, addr = self._sock.accept()
+            except (OSError, socket.error):
+                return
+            thread = threading.Thread(target=self._serve, args=(client,))
+            thread.daemon = True
+            thread.start()
+
+    def _serve(self, client):
+        transport = paramiko.Transport(client)
+        transport.add_server_key(self.host_key)
+        server = StandInServer(self)
+        transport.start_server(server=server)
+        self._transports.append(transport)
+        chan = transport.accept(20)
+        if chan is None or not server.shell.wait(10):
+            transport.close()
+            return
+
+        chan.sendall(b'\r\nInfo: The max number of VTY users is 5.\r\n' + self.prompt)
+        buf = b''
+        while True:
+            try:
+                data = chan.recv(1024)
+            except (EOFError, OSError, socket.error):
+                break
+            if not data:
+                break
+            buf += data
+            while b'\r' in buf or b'\n' in buf:
+                index = min(i for i in (buf.find(b'\r'), buf.find(b'\n')) if i != -1)
+                line, buf = buf[:index].strip(), buf[index + 1:].lstrip(b'\r\n')
+                out = OUTPUTS.get(line, b'')
+                chan.sendall(line + b'\r\n' + (out + b'\r\n' if out else b'') + self.prompt)
+        transport.close()
+
+    def drop_sessions(self):
+        """ Close every SSH session, as a switch reload would
+        """
+        for transport in self._transports:
+            transport.close()
+        del self._transports[:]
+
+    def close(self):
+        self.drop_sessions()
+        self._sock.close()
+
+    def play_context(self, user='admin'):
+        """ The play context of a network_cli session to the stand-in
+        """
+        pc = PlayContext()
+        pc.connection = 'network_cli'
+        pc.network_os = 'huawei_s'
+        pc.remote_addr = '127.0.0.1'
+        pc.port = self.port
+        pc.remote_user = user
+        pc.password = PASSWORD
+        pc.become = False
+        return huawei_s_action.ConnectionPool.normalize(pc)
+
+
+@pytest.fixture
+def switch():
+    if paramiko is None:
+        pytest.skip('the SSH stand-in needs paramiko')
+    device = StandInSwitch()
+    yield device
+    device.close()
+
+
+@pytest.fixture
+def control_path(tmp_path, monkeypatch):
+    path = str(tmp_path / 'pc')
+    monkeypatch.setattr(C, 'PERSISTENT_CONTROL_PATH_DIR', path)
+    # read by the ansible-connection processes
+    monkeypatch.setenv('ANSIBLE_PERSISTENT_CONTROL_PATH_DIR', path)
+    monkeypatch.setenv('ANSIBLE_HOST_KEY_CHECKING', 'False')
+    monkeypatch.setenv('ANSIBLE_PARAMIKO_LOOK_FOR_KEYS', 'False')
+    yield path
+    # the sessions outlive the test otherwise
+    if os.path.isdir(path):
+        for name in os.listdir(path):
+            sock = os.path.join(path, name)
+            if not name.startswith('.'):
+                try:
+                    Connection(sock).close()
+                except Exception:
+                    pass
+
+
+@pytest.fixture
+def open_session():
+    """ Attach to the session of a pool to the stand-in or open one
+    """
+    def open_session(pool, pc):
+        socket_path = pool.attach(pc, {'ansible_command_timeout': 10})
+        reused = socket_path is not None
+        if not reused:
+            socket_path = pool.open(pc, None, {'ansible_command_timeout': 10})
+        pool.record(pc, reused)
+        return socket_path, reused
+    return open_session